@@ -1,39 +1,586 @@
 import tkinter as tk
-from tkinter import messagebox as msg, simpledialog, ttk
-import os
+from tkinter import messagebox as msg, simpledialog, ttk, font as tkfont
+import bisect
+import gc
 import json
-from datetime import datetime, date
-import re
-
-# Fallback for colored print if termcolor not installed (for console prints)
-try:
-    from termcolor import colored
-except ImportError:
-    def colored(text, color=None):
-        return text
-
-print(colored('Hello World!', 'red'))
-print(colored('Success!', 'green'))
-
-DATA_FILE = "todo.json"
-PRIORITIES = ["Low", "Medium", "High", "Critical"]
-CATEGORIES = ["Personal", "Work", "Shopping", "Health", "Education", "Finance", "Other"]
+import queue
+import threading
+from collections import namedtuple
+from datetime import datetime, date, time, timedelta
+from time import perf_counter
+
+from todo_engine import (
+    PRIORITIES, CATEGORIES, colored,
+    RELEVANCE_SORT, ExportCancelled, TaskExporter, TaskImporter, TaskViewModel, UndoLog,
+    create_task, missed_occurrences, open_task_store, parse_due, parse_recurrence, set_completed,
+    set_recurrence, upcoming_occurrences,
+)
+
 PRIORITY_COLORS = {
     "Low": "#28a745",
     "Medium": "#ffc107", 
     "High": "#fd7e14",
     "Critical": "#dc3545"
 }
+PRIORITY_ICONS = {
+    "Low": "🔵",
+    "Medium": "🟡",
+    "High": "🟠",
+    "Critical": "🔴"
+}
+CATEGORY_ICONS = {
+    "Personal": "👤",
+    "Work": "💼",
+    "Shopping": "🛒",
+    "Health": "🏥",
+    "Education": "📚",
+    "Finance": "💰",
+    "Other": "📋"
+}
+SAVE_STATES = {
+    "saving": ("💾 Saving…", "#f1c40f"),
+    "saved": ("💾 Saved", "#2ecc71"),
+    "error": ("⚠ Save error", "#e74c3c"),
+}
+SORT_CHOICES = {
+    "Due Date": "date",
+    "Priority": "priority",
+    "Category": "category",
+    "Created": "created",
+    "Completed": "crossed",
+}
+ROW_COLORS = {
+    "done": "#7f8c8d",
+    "overdue": "#e74c3c",   # Red for overdue
+    "critical": "#c0392b",  # Dark red for critical
+    "high": "#e67e22",      # Orange for high
+    "normal": "#2c3e50",    # Default
+}
+SEARCH_DEBOUNCE_MS = 150  # quiet time after the last keystroke before searching
+SEARCH_MIN_LENGTH = 3  # shorter search text would match most of a large list, so the full list stays up
+REPEAT_CHOICES = ["", "daily", "weekdays", "weekly", "every 2 weeks", "monthly", "yearly"]
+MISSED_OCCURRENCE_LIMIT = 99  # rows stop counting missed repeats here
+UPCOMING_OCCURRENCES = 5  # next due dates listed in the task details
+SAVE_DEBOUNCE_MS = 300  # changes made within this window share one journal write
+EXTERNAL_POLL_MS = 2000  # how often to look for changes saved by other windows or scripts
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)  # histogram upper bounds, plus one open bucket
+# Handlers timed for Help → Performance: hot paths, the search trace and every button command
+TIMED_HANDLERS = (
+    "load_tasks", "listbox_load", "save_tasks", "flush_changes", "merge_external_changes",
+    "schedule_search", "run_search", "update_sort",
+    "add_item", "edit_task", "cross_item", "uncross_item", "delete_tasks", "delete_selected",
+    "clear_list", "clear_completed", "set_selected_field", "undo", "redo",
+    "import_tasks", "export_tasks",
+)
+
+
+class PersistenceWorker:
+    """Dedicated thread that runs disk I/O jobs in submission order.
+
+    Results travel back through a queue that the Tk mainloop polls with
+    ``after()`` only while jobs are outstanding, so completion callbacks
+    always run on the UI thread and an idle app schedules no wakeups.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.outstanding = 0
+        self.poll_job = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, job, on_done=None, on_error=None):
+        """Queue ``job()``; its result or exception is handed to a callback"""
+        self.outstanding += 1
+        self.jobs.put((job, on_done, on_error))
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(self.POLL_MS, self.poll)
+
+    def run(self):
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                break
+            job, on_done, on_error = item
+            try:
+                self.results.put((on_done, job(), True))
+            except ExportCancelled as e:
+                # Cancelling is a normal outcome, not a failure
+                self.results.put((on_error, e, True))
+            except Exception as e:
+                print(colored(f"Background I/O error: {e}", "red"))
+                self.results.put((on_error, e, True))
+
+    def report(self, callback, value):
+        """Called from a running job to deliver progress to the UI thread"""
+        self.results.put((callback, value, False))
+
+    def poll(self):
+        """Deliver finished jobs to their callbacks on the UI thread"""
+        self.poll_job = None
+        while True:
+            try:
+                callback, value, finished = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if finished:
+                self.outstanding -= 1
+            if callback is not None:
+                callback(value)
+        if self.outstanding:
+            self.poll_job = self.widget.after(self.POLL_MS, self.poll)
+
+    def stop(self):
+        """Finish queued jobs and stop the thread"""
+        self.jobs.put(None)
+        self.thread.join()
+        if self.poll_job is not None:
+            self.widget.after_cancel(self.poll_job)
+            self.poll_job = None
+
+
+class StartupTimer:
+    """Wall-clock time spent in each startup phase, for Help → Startup Timing"""
+
+    def __init__(self):
+        self.started = self.last = perf_counter()
+        self.phases = []
+        self.notes = []
+
+    def mark(self, phase):
+        """Close the current phase under ``phase``"""
+        now = perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    def elapsed(self):
+        return (self.last - self.started) * 1000
+
+    def report(self):
+        lines = [f"{phase:<24}{ms:>9.1f} ms" for phase, ms in self.phases]
+        lines.append(f"{'total':<24}{self.elapsed():>9.1f} ms")
+        return "\n".join(lines + [""] + self.notes if self.notes else lines)
+
+
+class HandlerStats:
+    """Call count, latency histogram and rows rendered for one handler"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.rows = 0
+
+    def add(self, ms):
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls (None: slower than all)"""
+        wanted = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= wanted:
+                return bound
+        return None
+
+    def as_dict(self):
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_le_ms": self.percentile(0.5),
+            "p95_le_ms": self.percentile(0.95),
+            "rows_rendered": self.rows,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class PerfMonitor:
+    """Lightweight timing of UI handlers, for Help → Performance.
+
+    ``instrument`` replaces methods with wrappers that add two
+    perf_counter() calls and a histogram increment per call. Rows the
+    virtual listbox renders are credited to every handler running at the
+    time, or to scrolling when none is.
+    """
+
+    SCROLLING = "(scroll / resize)"
+
+    def __init__(self):
+        self.stats = {}
+        self.active = []
+        self.lock = threading.Lock()
+        self.started = datetime.now()
+
+    def instrument(self, obj, names):
+        for name in names:
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def wrap(self, name, func, background=False):
+        """Time ``func`` under ``name``; background wrappers may run off the UI thread"""
+        def timed(*args, **kwargs):
+            if not background:
+                self.active.append(name)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, (perf_counter() - start) * 1000)
+                if not background:
+                    self.active.pop()
+        return timed
+
+    def record(self, name, ms):
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = HandlerStats()
+            stats.add(ms)
+
+    def count_rows(self, rows):
+        """Credit rows rendered by the listbox to the running handlers"""
+        with self.lock:
+            for name in self.active or [self.SCROLLING]:
+                stats = self.stats.get(name)
+                if stats is None:
+                    stats = self.stats[name] = HandlerStats()
+                stats.rows += rows
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+            self.started = datetime.now()
+
+    def report(self):
+        """Fixed-width table, slowest total first, each handler followed by its histogram"""
+        with self.lock:
+            stats = sorted(self.stats.items(), key=lambda item: -item[1].total_ms)
+        lines = [f"Since {self.started:%Y-%m-%d %H:%M:%S}", "",
+                 f"{'handler':<26}{'calls':>7}{'mean ms':>10}{'p95 ≤ms':>9}{'max ms':>10}{'rows':>9}"]
+        for name, stat in stats:
+            mean = stat.total_ms / stat.calls if stat.calls else 0.0
+            p95 = stat.percentile(0.95) if stat.calls else 0
+            p95_text = f">{LATENCY_BUCKETS_MS[-1]}" if p95 is None else str(p95)
+            lines.append(f"{name:<26}{stat.calls:>7}{mean:>10.2f}{p95_text:>9}{stat.max_ms:>10.2f}{stat.rows:>9}")
+            if stat.calls:
+                bars = [f"≤{bound}:{count}" for bound, count in zip(LATENCY_BUCKETS_MS, stat.buckets) if count]
+                if stat.buckets[-1]:
+                    bars.append(f">{LATENCY_BUCKETS_MS[-1]}:{stat.buckets[-1]}")
+                lines.append(f"{'':<4}{'  '.join(bars)}")
+        if not stats:
+            lines.append("No handler has run yet.")
+        return "\n".join(lines)
+
+    def export(self, file_path, context=None):
+        """Write every handler's numbers to JSON for offline comparison"""
+        with self.lock:
+            handlers = {name: stat.as_dict() for name, stat in self.stats.items()}
+        data = {"started": self.started.isoformat(timespec="seconds"),
+                "exported": datetime.now().isoformat(timespec="seconds"),
+                "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+                "handlers": handlers}
+        data.update(context or {})
+        with open(file_path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+RenderRecord = namedtuple("RenderRecord", "signature due_ordinal status_icon priority_icon display color_class")
+
+
+def render_signature(task):
+    """The task fields a rendered row depends on"""
+    return (task["text"], task.get("crossed", False), task.get("priority", "Medium"),
+            task.get("category", "Other"), task.get("due", ""), task.get("repeat"))
+
+
+def build_render_record(task, today_ordinal):
+    """Format one task row: icons, due date display and color class"""
+    crossed = task.get("crossed", False)
+    status_icon = '✅' if crossed else '📌'
+    priority_icon = PRIORITY_ICONS.get(task.get("priority", "Medium"), "🟡")
+    category_icon = CATEGORY_ICONS.get(task.get("category", "Other"), "📋")
+
+    # Format due date
+    due_text = task.get("due", "")
+    due_ordinal = None
+    if due_text:
+        try:
+            due_ordinal = date.fromisoformat(due_text).toordinal()
+        except ValueError:
+            due_ordinal = None
+    if due_ordinal is None:
+        due_display = f"📅 {due_text}" if due_text else "📅 No date"
+    elif due_ordinal < today_ordinal and not crossed:
+        # Only the occurrences between the due date and today are generated
+        missed = missed_occurrences(task, date.fromordinal(today_ordinal), MISSED_OCCURRENCE_LIMIT)
+        if missed:
+            count = f"{missed}+" if missed == MISSED_OCCURRENCE_LIMIT else missed
+            due_display = f"⚠ {due_text} (OVERDUE, {count} more missed)"
+        else:
+            due_display = f"⚠ {due_text} (OVERDUE)"
+    elif due_ordinal == today_ordinal:
+        due_display = f"⏰ {due_text} (TODAY)"
+    else:
+        due_display = f"📅 {due_text}"
+
+    if task.get("repeat"):
+        due_display += " 🔁"
+    display = f"{status_icon} {priority_icon} {category_icon} {task['text']} | {due_display}"
+
+    # Color coding
+    if crossed:
+        color_class = "done"
+    elif due_ordinal is not None and due_ordinal < today_ordinal:
+        color_class = "overdue"
+    elif task.get("priority") == "Critical":
+        color_class = "critical"
+    elif task.get("priority") == "High":
+        color_class = "high"
+    else:
+        color_class = "normal"
+    return RenderRecord(render_signature(task), due_ordinal, status_icon, priority_icon, display, color_class)
+
+
+class RenderCache:
+    """Cached render records per task ID.
+
+    A record is rebuilt only when the task's displayed fields change or the
+    day rolls over, so a refresh is a dictionary lookup per visible row.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.today_ordinal = date.today().toordinal()
+
+    def set_day(self, today):
+        """Drop every record when the date changes (overdue/today labels move)"""
+        if today.toordinal() != self.today_ordinal:
+            self.today_ordinal = today.toordinal()
+            self.records.clear()
+
+    def record(self, task):
+        record = self.records.get(task["id"])
+        if record is None or record.signature != render_signature(task):
+            record = build_render_record(task, self.today_ordinal)
+            self.records[task["id"]] = record
+        return record
+
+    def discard(self, task_id):
+        self.records.pop(task_id, None)
+
+
+class VirtualListbox:
+    """Virtualized rows on top of a tk.Listbox.
+
+    Only the rows in the visible window plus a small overscan are formatted
+    and inserted into the widget, and the scrollbar is mapped to the logical
+    row count, so redraw cost and widget memory stay flat however many
+    tasks match. Selection is tracked by logical row, so Ctrl/Shift-click
+    selections survive scrolling rows out of the rendered window.
+    """
+
+    OVERSCAN = 10
+    WHEEL_ROWS = 3
+
+    def __init__(self, listbox, scrollbar, render, on_fill=None):
+        self.listbox = listbox
+        self.scrollbar = scrollbar
+        self.render = render
+        self.on_fill = on_fill  # told how many rows each refill rendered
+        self.rows = []
+        self.top = 0
+        self.window_start = 0
+        self.window_end = 0
+        self.selected = set()
+        self.anchor = None
+        self.line_height = tkfont.Font(font=listbox.cget("font")).metrics("linespace") + 1
+        self.page = 1
+
+        listbox.config(yscrollcommand="")
+        scrollbar.config(command=self.yview)
+        listbox.bind("<Configure>", lambda e: self.on_resize())
+        listbox.bind("<<ListboxSelect>>", lambda e: self.on_select())
+        listbox.bind("<Button-1>", lambda e: self.on_click(e, "replace"))
+        listbox.bind("<Control-Button-1>", lambda e: self.on_click(e, "toggle"))
+        listbox.bind("<Shift-Button-1>", lambda e: self.on_click(e, "range"))
+        listbox.bind("<Control-a>", lambda e: self.select_all())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            listbox.bind(sequence, self.on_wheel)
+        listbox.bind("<Up>", lambda e: self.move_selection(-1))
+        listbox.bind("<Down>", lambda e: self.move_selection(1))
+        listbox.bind("<Prior>", lambda e: self.move_selection(-self.page))
+        listbox.bind("<Next>", lambda e: self.move_selection(self.page))
+
+    def set_rows(self, rows):
+        """Show a new logical row list, keeping the scroll position"""
+        self.rows = rows
+        self.selected.clear()
+        self.anchor = None
+        self.scroll_to(self.top, refill=True)
+
+    def scroll_to(self, top, refill=False):
+        """Make logical row ``top`` the first visible row"""
+        self.top = max(0, min(top, len(self.rows) - self.page))
+        # Small scrolls stay inside the overscan and need no re-render
+        if refill or self.top < self.window_start or self.top + self.page > self.window_end:
+            self.fill_window()
+        self.listbox.yview(self.top - self.window_start)
+        self.update_scrollbar()
+
+    def fill_window(self):
+        """Format and insert only the visible rows plus overscan"""
+        start = max(0, self.top - self.OVERSCAN)
+        end = min(len(self.rows), self.top + self.page + self.OVERSCAN)
+        self.listbox.delete(0, tk.END)
+        for row in range(start, end):
+            text, color = self.render(self.rows[row])
+            self.listbox.insert(tk.END, text)
+            self.listbox.itemconfig(tk.END, fg=color)
+        self.window_start, self.window_end = start, end
+        if self.on_fill is not None:
+            self.on_fill(end - start)
+        for row in self.selected:
+            if start <= row < end:
+                self.listbox.selection_set(row - start)
+
+    def update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.page:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.page) / total))
+
+    def yview(self, *args):
+        """Scrollbar command, translated to logical rows"""
+        if args[0] == tk.MOVETO:
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == tk.SCROLL:
+            step = self.page if args[2] == tk.PAGES else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        delta = -self.WHEEL_ROWS if event.num == 4 or event.delta > 0 else self.WHEEL_ROWS
+        self.scroll_to(self.top + delta)
+        return "break"
+
+    def on_resize(self):
+        page = max(1, self.listbox.winfo_height() // self.line_height)
+        if page != self.page:
+            self.page = page
+            self.scroll_to(self.top, refill=True)
+
+    def on_select(self):
+        # Tk only knows the rendered window; keep selected rows outside it
+        outside = {row for row in self.selected if not self.window_start <= row < self.window_end}
+        self.selected = outside | {self.window_start + i for i in self.listbox.curselection()}
+
+    def on_click(self, event, mode):
+        """Click, Ctrl-click and Shift-click selection by logical row"""
+        self.listbox.focus_set()
+        if not self.rows:
+            return "break"
+        row = self.row_at(event.y)
+        if mode == "toggle":
+            self.selected ^= {row}
+            self.anchor = row
+        elif mode == "range" and self.anchor is not None:
+            low, high = sorted((self.anchor, row))
+            self.selected = set(range(low, high + 1))
+        else:
+            self.selected = {row}
+            self.anchor = row
+        self.sync_selection()
+        self.listbox.activate(row - self.window_start)
+        return "break"
+
+    def row_at(self, y):
+        """Logical row under a y coordinate, or None if the list is empty"""
+        if not self.rows:
+            return None
+        return min(self.window_start + self.listbox.nearest(y), len(self.rows) - 1)
+
+    def select_rows(self, rows):
+        self.selected = set(rows)
+        self.anchor = min(rows) if rows else None
+        self.sync_selection()
+
+    def select_all(self):
+        self.select_rows(range(len(self.rows)))
+        return "break"
+
+    def sync_selection(self):
+        """Mirror the logical selection onto the rendered window"""
+        self.listbox.selection_clear(0, tk.END)
+        for row in self.selected:
+            if self.window_start <= row < self.window_end:
+                self.listbox.selection_set(row - self.window_start)
+
+    def move_selection(self, delta):
+        """Keyboard navigation that scrolls past the rendered window"""
+        if not self.rows:
+            return "break"
+        row = min(self.selected) + delta if self.selected else self.top
+        row = max(0, min(row, len(self.rows) - 1))
+        self.selected = {row}
+        self.anchor = row
+        if row < self.top:
+            self.scroll_to(row)
+        elif row >= self.top + self.page:
+            self.scroll_to(row - self.page + 1)
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(row - self.window_start)
+        self.listbox.activate(row - self.window_start)
+        return "break"
+
+    def selection(self):
+        """Selected logical rows, in order"""
+        return sorted(self.selected)
+
+    def selection_clear(self):
+        self.selected.clear()
+        self.anchor = None
+        self.listbox.selection_clear(0, tk.END)
+
 
 class ModernTodoApp(tk.Tk):
     def __init__(self):
+        # Critical phase: everything needed to paint the first screenful.
+        # Menus, timers and the remaining indexes follow in start_deferred().
+        self.startup = StartupTimer()
         super().__init__()
+        # Time the hot paths and button commands before anything binds them
+        self.perf = PerfMonitor()
+        self.perf.instrument(self, TIMED_HANDLERS)
         # Modern window configuration
         self.configure_window()
+        self.startup.mark("window")
         
         # Data
-        self.tasks = []
+        self.store = open_task_store()
         self.load_tasks()
+        # The whole snapshot and journal are read before painting: a partial
+        # list could not honor the journal's edits and deletes
+        self.startup.mark("load tasks (all)")
+        self.startup.notes.append("All tasks load before the first paint; only index builds are deferred.")
+        self.worker = PersistenceWorker(self)
+        self.exporter = None
+        self.save_job = None
+        self.warm_up_job = None
+        self.warmed_up = False
+        self.view = TaskViewModel(self.store)
+        self.render_cache = RenderCache()
+        self.undo_log = UndoLog()
         self.sort_by = "date"
         self.show_completed = True
 
@@ -53,6 +600,8 @@ class ModernTodoApp(tk.Tk):
         self.create_priority_menu()
         self.create_category_menu()
         self.due_entry = self.create_due_entry()
+        self.repeat_var = tk.StringVar(value="")
+        self.create_repeat_menu()
         self.create_add_button()
         self.create_search_and_sort_bar()
         self.list_display_frame = self.create_display_frame()
@@ -72,13 +621,65 @@ class ModernTodoApp(tk.Tk):
         
         # Keyboard shortcuts
         self.setup_keyboard_shortcuts()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.startup.mark("build widgets")
+
+        # Initial display
+        self.listbox_load()
+        self.startup.mark("first screenful")
+        self.after_idle(self.start_deferred)
+
+    def start_deferred(self):
+        """Deferred phase: runs once the first screenful is on screen"""
+        self.update_idletasks()
+        self.startup.mark("first paint")
+        self.create_menu_bar()
 
         # Auto-save feature
         self.auto_save_timer()
+        self.schedule_day_rollover()
+        self.watch_external()
+        self.startup.mark("menus and timers")
+
+        # Build the indexes load() skipped, one short step per idle slot
+        self.start_warm_up()
+
+    def start_warm_up(self):
+        """Step through the store's deferred index builds in idle slots"""
+        self.warm_up_steps = self.store.warm_up()
+        if self.warm_up_job is None:
+            # Full collections would walk the growing indexes several times,
+            # each a pause of hundreds of ms at 100k tasks
+            gc.disable()
+            self.warm_up_job = self.after(1, self.warm_up_step)
+
+    def warm_up_step(self):
+        self.warm_up_job = None
+        try:
+            next(self.warm_up_steps)
+        except StopIteration:
+            self.finish_warm_up()
+            if not self.warmed_up:
+                self.warmed_up = True
+                self.startup.mark("index warm-up")
+                print(colored(f"Startup finished in {self.startup.elapsed():.0f} ms", "cyan"))
+            return
+        except Exception as e:
+            # Indexes are still built on demand, so this only costs speed
+            print(colored(f"Index warm-up error: {e}", "yellow"))
+            self.finish_warm_up()
+            return
+        self.warm_up_job = self.after(1, self.warm_up_step)
 
-        # Initial display
-        self.listbox_load()
-        self.update_status_bar()
+    def finish_warm_up(self):
+        # Tasks and indexes live as long as the window and hold no reference
+        # cycles, so later collections can skip them; refcounting still frees them
+        gc.freeze()
+        gc.enable()
+
+    def show_startup_timing(self):
+        """Show how long each startup phase took"""
+        msg.showinfo("Startup Timing", self.startup.report())
 
     def configure_window(self):
         """Configure modern window appearance and behavior"""
@@ -218,6 +819,13 @@ class ModernTodoApp(tk.Tk):
         due.bind('<KeyRelease>', self.validate_date)
         return due
     
+    def create_repeat_menu(self):
+        tk.Label(self.input_row, text="Repeat:", font=('Segoe UI', 12), bg="#ecf0f1").pack(side=tk.LEFT, padx=(0,5))
+        # Editable, so rules like "every mon,thu" can be typed in
+        menu = ttk.Combobox(self.input_row, textvariable=self.repeat_var, values=REPEAT_CHOICES, width=12)
+        menu.pack(side=tk.LEFT, padx=(0,10))
+        return menu
+
     def validate_date(self, event):
         """Real-time date validation"""
         date_text = event.widget.get()
@@ -269,7 +877,8 @@ class ModernTodoApp(tk.Tk):
                 fg="#ecf0f1").pack(side=tk.LEFT, padx=(0,5))
         
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", lambda *args: self.listbox_load())
+        self.search_job = None
+        self.search_var.trace("w", lambda *args: self.schedule_search())
         search_entry = tk.Entry(left_frame, 
                                textvariable=self.search_var, 
                                font=("Segoe UI", 12), 
@@ -290,13 +899,13 @@ class ModernTodoApp(tk.Tk):
                 fg="#ecf0f1").pack(side=tk.LEFT, padx=(0,5))
         
         self.sort_var = tk.StringVar(value="Due Date")
-        sort_menu = ttk.Combobox(right_frame, 
+        self.sort_menu = ttk.Combobox(right_frame, 
                                 textvariable=self.sort_var, 
-                                values=["Due Date", "Priority", "Category", "Created", "Completed"],
+                                values=list(SORT_CHOICES),
                                 state="readonly",
                                 width=12)
-        sort_menu.pack(side=tk.LEFT, padx=(0,15))
-        sort_menu.bind('<<ComboboxSelected>>', lambda _: self.update_sort())
+        self.sort_menu.pack(side=tk.LEFT, padx=(0,15))
+        self.sort_menu.bind('<<ComboboxSelected>>', lambda _: self.update_sort())
         
         self.show_completed_var = tk.BooleanVar(value=True)
         completed_check = tk.Checkbutton(right_frame, 
@@ -319,6 +928,38 @@ class ModernTodoApp(tk.Tk):
                                          fg="#bdc3c7")
         self.task_counter_label.pack(side=tk.LEFT, padx=(15,0))
 
+    def schedule_search(self):
+        """Debounce the search box so a burst of keystrokes runs one query"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        """Refresh the list for the current search text"""
+        self.search_job = None
+        self.update_sort_choices(bool(self.search_text()))
+        self.listbox_load()
+        if self.search_text() != self.typed_search_text():
+            self.status_label.config(text=f"🔍 Type at least {SEARCH_MIN_LENGTH} characters to search")
+            self.after(3000, lambda: self.status_label.config(text="Ready"))
+
+    def typed_search_text(self):
+        """The search box contents, lowercased, without the placeholder"""
+        text = self.search_var.get().lower()
+        return "" if text == "search tasks..." else text
+
+    def search_text(self):
+        """The search to run: the typed text, or nothing while it is too short to narrow the list"""
+        text = self.typed_search_text()
+        return text if len(text.strip()) >= SEARCH_MIN_LENGTH else ""
+
+    def update_sort_choices(self, searching):
+        """Offer Sort by Relevance only while a search is active"""
+        self.sort_menu.config(values=list(SORT_CHOICES) + (["Relevance"] if searching else []))
+        if not searching and self.sort_by == RELEVANCE_SORT:
+            self.sort_var.set("Due Date")
+            self.sort_by = "date"
+
     def create_display_frame(self):
         frame = tk.Frame(self, bg="#ecf0f1", padx=20, pady=15)
         frame.pack(fill=tk.BOTH, expand=True)
@@ -345,13 +986,16 @@ class ModernTodoApp(tk.Tk):
                            selectbackground="#3498db", 
                            selectforeground="#ffffff",
                            activestyle=tk.NONE, 
+                           selectmode=tk.EXTENDED,
                            cursor="hand2",
                            borderwidth=0,
                            highlightthickness=0)
         listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Add double-click to edit
+        # Add double-click to edit, right-click for batch actions
         listbox.bind('<Double-Button-1>', lambda e: self.edit_task())
+        listbox.bind('<Button-3>', self.show_context_menu)
+        self.context_menu = None
         
         return listbox
 
@@ -361,8 +1005,8 @@ class ModernTodoApp(tk.Tk):
         return scrollbar
 
     def show_scrollbar(self):
-        self.todo_display_listbox.config(yscrollcommand=self.listbox_scrollbar.set)
-        self.listbox_scrollbar.config(command=self.todo_display_listbox.yview)
+        self.task_list = VirtualListbox(self.todo_display_listbox, self.listbox_scrollbar, self.format_task_row,
+                                        on_fill=self.perf.count_rows)
 
     def create_operation_frame(self):
         frame = tk.Frame(self, bg="#2c3e50", height=80)
@@ -400,7 +1044,7 @@ class ModernTodoApp(tk.Tk):
             ("edit", "✏ Edit", "#3498db", self.edit_task),
             ("complete", "✅ Complete", "#27ae60", self.cross_item),
             ("incomplete", "↩ Reopen", "#f39c12", self.uncross_item),
-            ("delete", "🗑 Delete", "#e74c3c", self.delete_crossed_item),
+            ("delete", "🗑 Delete", "#e74c3c", self.delete_tasks),
             ("clear", "🧹 Clear All", "#95a5a6", self.clear_list),
             ("clear_completed", "🗑✅ Clear Done", "#e67e22", self.clear_completed)
         ]
@@ -453,8 +1097,18 @@ class ModernTodoApp(tk.Tk):
                                    bg="#34495e",
                                    fg="#ecf0f1")
         self.status_label.pack(side=tk.LEFT, padx=10, pady=5)
+
+        # Shown only while an export is running
+        self.cancel_export_btn = tk.Button(self.status_frame,
+                                           text="✖ Cancel",
+                                           font=("Segoe UI", 9),
+                                           bg="#e74c3c",
+                                           fg="white",
+                                           relief=tk.FLAT,
+                                           cursor="hand2",
+                                           command=self.cancel_export)
         
-        # Add current time
+        # Add current time and background save state
         self.time_label = tk.Label(self.status_frame,
                                  text="",
                                  font=("Segoe UI", 10),
@@ -462,8 +1116,20 @@ class ModernTodoApp(tk.Tk):
                                  fg="#bdc3c7")
         self.time_label.pack(side=tk.RIGHT, padx=10, pady=5)
         
+        self.save_state_label = tk.Label(self.status_frame,
+                                       text="",
+                                       font=("Segoe UI", 10),
+                                       bg="#34495e",
+                                       fg="#bdc3c7")
+        self.save_state_label.pack(side=tk.RIGHT, padx=10, pady=5)
+        
         self.update_time()
 
+    def set_save_state(self, state):
+        """Show "saving…", "saved" or "error" in the status bar"""
+        text, color = SAVE_STATES[state]
+        self.save_state_label.config(text=text, fg=color)
+
     def update_time(self):
         """Update the time display"""
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -474,7 +1140,10 @@ class ModernTodoApp(tk.Tk):
         """Setup keyboard shortcuts"""
         self.bind('<Control-n>', lambda e: self.item_entry_box.focus())
         self.bind('<Control-s>', lambda e: self.save_tasks())
-        self.bind('<Delete>', lambda e: self.delete_crossed_item())
+        self.bind('<Delete>', lambda e: self.delete_tasks())
+        self.bind('<Control-z>', lambda e: self.undo())
+        self.bind('<Control-y>', lambda e: self.redo())
+        self.bind('<Control-Z>', lambda e: self.redo())
         self.bind('<F2>', lambda e: self.edit_task())
         self.bind('<space>', lambda e: self.cross_item())
         self.bind('<Control-f>', lambda e: self.search_var.set('') or self.focus_search())
@@ -490,14 +1159,25 @@ class ModernTodoApp(tk.Tk):
                 break
 
     def auto_save_timer(self):
-        """Auto-save every 30 seconds"""
-        self.save_tasks()
+        """Every 30 seconds, save and fold the journal only if something changed"""
+        if self.save_job is None and self.store.is_dirty():
+            self.flush_changes()
         self.after(30000, self.auto_save_timer)
 
+    def schedule_day_rollover(self):
+        """Refresh overdue/today labels and counters just after midnight"""
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+        self.after(int((midnight - now).total_seconds() * 1000) + 1000, self.on_day_rollover)
+
+    def on_day_rollover(self):
+        self.listbox_load()
+        self.schedule_day_rollover()
+
     def update_status_bar(self):
         """Update the status bar with task statistics"""
-        total_tasks = len(self.tasks)
-        completed_tasks = len([t for t in self.tasks if t.get("crossed", False)])
+        total_tasks = self.store.count()
+        completed_tasks = self.store.count_completed()
         pending_tasks = total_tasks - completed_tasks
         overdue_tasks = self.count_overdue_tasks()
         
@@ -513,212 +1193,241 @@ class ModernTodoApp(tk.Tk):
 
     def count_overdue_tasks(self):
         """Count overdue tasks"""
-        today = date.today().strftime("%Y-%m-%d")
-        overdue = 0
-        for task in self.tasks:
-            if (not task.get("crossed", False) and 
-                task.get("due") and 
-                task.get("due") < today):
-                overdue += 1
-        return overdue
+        return self.store.count_overdue(date.today().strftime("%Y-%m-%d"))
 
     # ---- Data Handling ----
 
     def load_tasks(self):
-        """Load tasks from JSON file with error handling"""
-        if not os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "w") as f:
-                json.dump([], f)
+        """Load tasks from the configured store with error handling"""
         try:
-            with open(DATA_FILE, "r") as f:
-                self.tasks = json.load(f)
-                # Validate and update task structure for backward compatibility
-                self.validate_task_structure()
+            self.store.load()
         except Exception as e:
             print(colored(f"Error loading tasks: {e}", "red"))
-            self.tasks = []
-
-    def validate_task_structure(self):
-        """Ensure all tasks have required fields"""
-        for task in self.tasks:
-            # Add missing fields with defaults
-            if "category" not in task:
-                task["category"] = "Other"
-            if "created" not in task:
-                task["created"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            if "priority" not in task:
-                task["priority"] = "Medium"
-            if "due" not in task:
-                task["due"] = ""
-            if "crossed" not in task:
-                task["crossed"] = False
-            if "notes" not in task:
-                task["notes"] = ""
+            self.start_fresh_store(e)
 
-    def save_tasks(self):
-        """Save tasks to JSON file with backup"""
+    def start_fresh_store(self, error):
+        """Keep the unreadable files under new names and start on fresh ones"""
         try:
-            # Create backup before saving
-            if os.path.exists(DATA_FILE):
-                backup_file = f"{DATA_FILE}.backup"
-                with open(DATA_FILE, "r") as f:
-                    backup_data = f.read()
-                with open(backup_file, "w") as f:
-                    f.write(backup_data)
-            
-            # Save current tasks
-            with open(DATA_FILE, "w") as f:
-                json.dump(self.tasks, f, indent=2)
-                
+            moved = self.store.set_aside()
+            self.store = open_task_store()
+            self.store.load()
+        except Exception as e:
+            # Never run on a store that cannot save what the user types
+            print(colored(f"Error opening a fresh task store: {e}", "red"))
+            msg.showerror("Load Error", f"Could not load tasks: {error}\n\nCould not start a fresh list either: {e}")
+            raise SystemExit(1)
+        print(colored(f"Moved unreadable task files aside: {', '.join(moved)}", "yellow"))
+        msg.showwarning("Load Error", f"Could not load tasks: {error}\n\n"
+                        "The unreadable files were kept as:\n" + "\n".join(moved) +
+                        "\n\nStarting with a fresh task list.")
+
+    def persist(self, action, *args):
+        """Apply a change through the task store and schedule a background save"""
+        try:
+            action(*args)
+            return True
         except Exception as e:
             print(colored(f"Error saving tasks: {e}", "red"))
             msg.showerror("Save Error", f"Could not save tasks: {e}")
+            return False
+        finally:
+            self.schedule_save()
+
+    def schedule_save(self):
+        """Debounce saves so a burst of changes shares one journal write"""
+        if self.save_job is not None:
+            self.after_cancel(self.save_job)
+        self.save_job = self.after(SAVE_DEBOUNCE_MS, self.flush_changes)
+
+    def flush_changes(self):
+        """Hand buffered changes to the persistence worker"""
+        self.save_job = None
+        self.set_save_state("saving")
+        self.store.stage_changes()
+        self.worker.submit(self.perf.wrap("store.flush (background)", self.store.flush, background=True),
+                           on_done=self.on_saved, on_error=self.on_save_error)
+
+    def on_saved(self, _result=None):
+        if self.save_job is None and not self.store.is_dirty():
+            self.set_save_state("saved")
+        # A flush reads what other processes wrote before numbering its own records
+        self.merge_external_changes()
+
+    def on_save_error(self, error):
+        print(colored(f"Error saving tasks: {error}", "red"))
+        self.set_save_state("error")
+        msg.showerror("Save Error", f"Could not save tasks: {error}")
+
+    def watch_external(self):
+        """Look for changes other windows or scripts saved, one check at a time"""
+        self.worker.submit(self.store.poll_external, on_done=self.on_external_polled,
+                           on_error=self.on_external_polled)
+
+    def on_external_polled(self, _result=None):
+        self.merge_external_changes()
+        self.after(EXTERNAL_POLL_MS, self.watch_external)
+
+    def merge_external_changes(self):
+        """Fold other processes' changes into the list; unsaved local edits win"""
+        try:
+            changed = self.store.merge_external()
+        except Exception as e:
+            print(colored(f"Error merging external changes: {e}", "red"))
+            return
+        if not changed:
+            return
+        # Undo entries were recorded against the old states
+        self.undo_log.clear()
+        # Stores that drop indexes on an external change rebuild them in idle time
+        self.start_warm_up()
+        selected_ids = {self.view.row_ids[row] for row in self.task_list.selection()}
+        self.listbox_load()
+        if selected_ids:
+            self.task_list.select_rows([row for row, task_id in enumerate(self.view.row_ids) if task_id in selected_ids])
+        self.status_label.config(text="🔄 Updated with changes saved elsewhere")
+        self.after(3000, lambda: self.status_label.config(text="Ready"))
+
+    def save_tasks(self):
+        """Checkpoint pending changes into the store's main file in the background"""
+        if self.save_job is not None:
+            self.after_cancel(self.save_job)
+            self.save_job = None
+        self.set_save_state("saving")
+        self.store.stage_changes()
+        self.worker.submit(self.perf.wrap("store.checkpoint (background)", self.store.checkpoint, background=True),
+                           on_done=self.on_saved, on_error=self.on_save_error)
+
+    def on_close(self):
+        """Finish pending storage work and close the window"""
+        if self.save_job is not None:
+            self.after_cancel(self.save_job)
+            self.save_job = None
+        if self.exporter is not None:
+            self.exporter.cancel()
+        try:
+            self.worker.stop()
+            self.store.close()
+        except Exception as e:
+            print(colored(f"Error saving tasks: {e}", "red"))
+        self.destroy()
 
     def update_sort(self):
         """Update sort criteria and refresh display"""
-        mapping = {
-            "Due Date": "date",
-            "Priority": "priority", 
-            "Category": "category",
-            "Created": "created",
-            "Completed": "crossed"
-        }
-        self.sort_by = mapping[self.sort_var.get()]
+        self.sort_by = SORT_CHOICES.get(self.sort_var.get(), RELEVANCE_SORT)
         self.listbox_load()
 
     def export_tasks(self):
-        """Export tasks to different formats"""
+        """Stream tasks to JSON, JSON Lines, CSV or text in the background"""
+        if self.exporter is not None:
+            msg.showinfo("Export", "An export is already running")
+            return
         try:
             from tkinter import filedialog
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("JSON files", ".json"), ("Text files", ".txt"), ("CSV files", "*.csv")]
+                filetypes=[("JSON files", "*.json"), ("JSON Lines files", "*.jsonl"),
+                           ("CSV files", "*.csv"), ("Text files", "*.txt")]
             )
             if file_path:
-                if file_path.endswith('.json'):
-                    with open(file_path, 'w') as f:
-                        json.dump(self.tasks, f, indent=2)
-                elif file_path.endswith('.txt'):
-                    with open(file_path, 'w') as f:
-                        for task in self.tasks:
-                            status = "✅" if task.get("crossed") else "📌"
-                            f.write(f"{status} {task['text']} | Priority: {task.get('priority', 'Medium')} | Due: {task.get('due', 'No date')}\n")
-                msg.showinfo("Export Complete", f"Tasks exported to {file_path}")
+                total = self.store.count()
+                self.exporter = TaskExporter(
+                    self.store.export_rows(), total,
+                    progress=lambda fraction: self.worker.report(self.show_export_progress, fraction))
+                exporter = self.exporter
+                self.status_label.config(text=f"📤 Exporting {total} tasks...")
+                self.cancel_export_btn.pack(side=tk.LEFT, padx=5, pady=3)
+                self.worker.submit(
+                    lambda: exporter.run(file_path),
+                    on_done=lambda _: self.finish_export(f"Tasks exported to {file_path}"),
+                    on_error=self.finish_export)
         except Exception as e:
             msg.showerror("Export Error", f"Could not export tasks: {e}")
 
+    def show_export_progress(self, fraction):
+        if self.exporter is not None:
+            self.status_label.config(text=f"📤 Exporting tasks... {fraction:.0%}")
+
+    def cancel_export(self):
+        if self.exporter is not None:
+            self.exporter.cancel()
+            self.status_label.config(text="⏹️ Cancelling export...")
+
+    def finish_export(self, result):
+        """Report the outcome of a background export"""
+        self.exporter = None
+        self.cancel_export_btn.pack_forget()
+        if isinstance(result, ExportCancelled):
+            self.status_label.config(text="⏹️ Export cancelled")
+        elif isinstance(result, Exception):
+            self.status_label.config(text="Ready")
+            msg.showerror("Export Error", f"Could not export tasks: {result}")
+        else:
+            self.status_label.config(text="Ready")
+            msg.showinfo("Export Complete", result)
+
     def import_tasks(self):
-        """Import tasks from JSON file"""
+        """Stream tasks in from a JSON or JSON Lines file, skipping duplicates"""
         try:
             from tkinter import filedialog
             file_path = filedialog.askopenfilename(
-                filetypes=[("JSON files", "*.json")]
+                filetypes=[("JSON files", "*.json"), ("JSON Lines files", "*.jsonl")]
             )
             if file_path:
-                with open(file_path, 'r') as f:
-                    imported_tasks = json.load(f)
-                self.tasks.extend(imported_tasks)
-                self.validate_task_structure()
-                self.save_tasks()
-                self.listbox_load()
-                msg.showinfo("Import Complete", f"Imported {len(imported_tasks)} tasks")
+                self.status_label.config(text="📥 Importing tasks...")
+                importer = TaskImporter(
+                    self.store.all(),
+                    progress=lambda fraction: self.worker.report(self.show_import_progress, fraction))
+                self.worker.submit(
+                    lambda: importer.run(file_path),
+                    on_done=self.finish_import,
+                    on_error=lambda e: msg.showerror("Import Error", f"Could not import tasks: {e}"))
         except Exception as e:
             msg.showerror("Import Error", f"Could not import tasks: {e}")
 
-    # ---- Listbox and Task Management ----
+    def show_import_progress(self, fraction):
+        self.status_label.config(text=f"📥 Importing tasks... {fraction:.0%}")
 
-    def listbox_load(self):
-        """Load and display tasks in listbox with enhanced formatting"""
-        self.todo_display_listbox.delete(0, tk.END)
-        filter_text = self.search_var.get().lower()
-        show_completed = self.show_completed_var.get()
-        tasks = self.tasks
-
-        # Filtering
-        if filter_text and filter_text != "search tasks...":
-            tasks = [t for t in tasks if (
-                filter_text in t["text"].lower() or
-                filter_text in t.get("category", "").lower() or
-                filter_text in t.get("priority", "").lower()
-            )]
-
-        # Show/hide completed
-        if not show_completed:
-            tasks = [t for t in tasks if not t.get("crossed", False)]
-
-        # Sorting
-        if self.sort_by == "priority":
-            tasks.sort(key=lambda t: PRIORITIES.index(t.get("priority", "Medium")))
-        elif self.sort_by == "date":
-            tasks.sort(key=lambda t: t.get("due") or "9999-99-99")
-        elif self.sort_by == "category":
-            tasks.sort(key=lambda t: t.get("category", "Other"))
-        elif self.sort_by == "created":
-            tasks.sort(key=lambda t: t.get("created", ""))
-        elif self.sort_by == "crossed":
-            tasks.sort(key=lambda t: t.get("crossed", False))
-
-        # Display tasks with enhanced formatting
-        for idx, task in enumerate(tasks):
-            status_icon = '✅' if task.get("crossed", False) else '📌'
-            priority_icon = self.get_priority_icon(task.get("priority", "Medium"))
-            category_icon = self.get_category_icon(task.get("category", "Other"))
-            
-            # Format due date
-            due_text = task.get("due", "")
-            if due_text:
-                due_date = datetime.strptime(due_text, "%Y-%m-%d").date()
-                today = date.today()
-                if due_date < today and not task.get("crossed", False):
-                    due_display = f"⚠ {due_text} (OVERDUE)"
-                elif due_date == today:
-                    due_display = f"⏰ {due_text} (TODAY)"
-                else:
-                    due_display = f"📅 {due_text}"
-            else:
-                due_display = "📅 No date"
+    def finish_import(self, importer):
+        """Add the tasks the worker kept and refresh once"""
+        # Tasks added while the worker ran were not in its snapshot
+        importer.new_tasks(self.store.all())
+        if self.persist(self.store.extend, importer.imported):
+            self.undo_log.record(f"Import {len(importer.imported)} tasks",
+                                 {task["id"]: None for task in importer.imported})
+        self.listbox_load()
+        msg.showinfo("Import Complete",
+                     f"Imported {len(importer.imported)} tasks\n"
+                     f"Skipped {importer.duplicates} duplicate(s) and {importer.invalid} invalid record(s)")
 
-            display = f"{status_icon} {priority_icon} {category_icon} {task['text']} | {due_display}"
+    # ---- Listbox and Task Management ----
 
-            self.todo_display_listbox.insert(tk.END, display)
-            
-            # Color coding
-            if task.get("crossed", False):
-                self.todo_display_listbox.itemconfig(idx, fg="#7f8c8d")
-            elif due_text and due_text < date.today().strftime("%Y-%m-%d"):
-                self.todo_display_listbox.itemconfig(idx, fg="#e74c3c")  # Red for overdue
-            elif task.get("priority") == "Critical":
-                self.todo_display_listbox.itemconfig(idx, fg="#c0392b")  # Dark red for critical
-            elif task.get("priority") == "High":
-                self.todo_display_listbox.itemconfig(idx, fg="#e67e22")  # Orange for high
-            else:
-                self.todo_display_listbox.itemconfig(idx, fg="#2c3e50")  # Default
+    def listbox_load(self):
+        """Load the current view into the virtualized listbox"""
+        self.render_cache.set_day(date.today())
+        try:
+            rows, query_error = self.get_filtered_and_sorted_tasks(), None
+        except ValueError as e:
+            # A filter value that does not parse shows nothing until it is fixed
+            rows, query_error = [], e
+        self.task_list.set_rows(rows)
 
         # Update status bar
         self.update_status_bar()
+        if query_error is not None:
+            self.status_label.config(text=f"🔍 {query_error}")
+
+    def format_task_row(self, task):
+        """Return (display text, color) for one visible row from the render cache"""
+        record = self.render_cache.record(task)
+        return record.display, ROW_COLORS[record.color_class]
 
     def get_priority_icon(self, priority):
         """Get icon for priority level"""
-        icons = {
-            "Low": "🔵",
-            "Medium": "🟡", 
-            "High": "🟠",
-            "Critical": "🔴"
-        }
-        return icons.get(priority, "🟡")
+        return PRIORITY_ICONS.get(priority, "🟡")
 
     def get_category_icon(self, category):
         """Get icon for category"""
-        icons = {
-            "Personal": "👤",
-            "Work": "💼",
-            "Shopping": "🛒",
-            "Health": "🏥",
-            "Education": "📚",
-            "Finance": "💰",
-            "Other": "📋"
-        }
-        return icons.get(category, "📋")
+        return CATEGORY_ICONS.get(category, "📋")
 
     def add_item(self):
         """Add new task with enhanced validation"""
@@ -732,39 +1441,38 @@ class ModernTodoApp(tk.Tk):
             msg.showwarning("Input Error", "Task cannot be empty.")
             return
             
-        if due and due != "YYYY-MM-DD":
-            try:
-                due_date = datetime.strptime(due, "%Y-%m-%d").date()
-                # Warn if adding task with past due date
-                if due_date < date.today():
-                    if not msg.askyesno("Past Due Date", 
-                                      f"The due date {due} is in the past. Add anyway?"):
-                        return
-            except ValueError:
-                msg.showwarning("Date Error", "Due date must be in YYYY-MM-DD format.")
+        try:
+            due = parse_due("" if due == "YYYY-MM-DD" else due)
+        except ValueError:
+            msg.showwarning("Date Error", "Due date must be in YYYY-MM-DD format.")
+            return
+        # Warn if adding task with past due date
+        if due and due < date.today().isoformat():
+            if not msg.askyesno("Past Due Date", 
+                              f"The due date {due} is in the past. Add anyway?"):
                 return
-        else:
-            due = ""
             
-        # Check for duplicate tasks
-        if any(task['text'].lower() == new_item.lower() for task in self.tasks):
+        # Check for duplicate and near-duplicate tasks
+        if self.store.contains_text(new_item):
             if not msg.askyesno("Duplicate Task", 
-                              "A similar task already exists. Add anyway?"):
+                              "A task with the same text already exists. Add anyway?"):
                 return
+        else:
+            similar = self.store.similar_tasks(new_item)
+            if similar:
+                listing = "\n".join(f"• {t['text']}" for t in similar)
+                if not msg.askyesno("Similar Task",
+                                  f"Similar tasks already exist:\n\n{listing}\n\nAdd anyway?"):
+                    return
         
-        # Create new task
-        new_task = {
-            "text": new_item, 
-            "crossed": False,
-            "priority": priority,
-            "category": category,
-            "due": due, 
-            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "notes": ""
-        }
+        try:
+            new_task = create_task(new_item, priority, category, due, repeat=self.repeat_var.get())
+        except ValueError as e:
+            msg.showwarning("Repeat Error", str(e))
+            return
         
-        self.tasks.append(new_task)
-        self.save_tasks()
+        if self.persist(self.store.add, new_task):
+            self.undo_log.record(f"Add '{new_item}'", {new_task["id"]: None})
         self.listbox_load()
         
         # Clear input fields
@@ -772,71 +1480,189 @@ class ModernTodoApp(tk.Tk):
         self.add_placeholder(self.item_entry_box, "Enter your task here...")
         self.due_entry.delete(0, tk.END)
         self.add_placeholder(self.due_entry, "YYYY-MM-DD")
+        self.repeat_var.set("")
         
         # Show success message
         self.status_label.config(text=f"✅ Added task: {new_item}")
         self.after(3000, lambda: self.status_label.config(text="Ready"))
 
     def cross_item(self):
-        """Mark task as completed with confirmation"""
+        """Mark the selected tasks as completed"""
         try:
-            idx = self.todo_display_listbox.curselection()[0]
-            tasks = self.get_filtered_and_sorted_tasks()
-            real_idx = self.tasks.index(tasks[idx])
-            
-            if not self.tasks[real_idx]["crossed"]:
-                self.tasks[real_idx]["crossed"] = True
-                self.tasks[real_idx]["completed_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.save_tasks()
-                self.listbox_load()
-                self.status_label.config(text=f"✅ Completed: {self.tasks[real_idx]['text']}")
+            tasks = self.selected_tasks()
+            if not tasks:
+                raise IndexError
+            changed = self.update_tasks(tasks, lambda task: set_completed(task, True), "Complete")
+            if changed:
+                text = f"✅ Completed: {changed[0]['text']}" if len(changed) == 1 else f"✅ Completed {len(changed)} tasks"
+                if len(changed) == 1 and changed[0].get("repeat"):
+                    text = f"🔁 Completed: {changed[0]['text']}, next due {changed[0]['due']}"
+                self.status_label.config(text=text)
                 self.after(3000, lambda: self.status_label.config(text="Ready"))
             else:
-                msg.showinfo("Already Completed", "This task is already marked as completed.")
+                msg.showinfo("Already Completed", "The selected task(s) are already marked as completed.")
             
-            self.todo_display_listbox.selection_clear(0, tk.END)
+            self.task_list.selection_clear()
         except IndexError:
             msg.showwarning(title="WARNING", message="Select a task to mark as completed.")
         except Exception as e:
             print(colored(f"CROSS EVENT ERROR: {e}", "yellow"))
 
     def uncross_item(self):
-        """Mark task as incomplete"""
+        """Mark the selected tasks as incomplete"""
         try:
-            idx = self.todo_display_listbox.curselection()[0]
-            tasks = self.get_filtered_and_sorted_tasks()
-            real_idx = self.tasks.index(tasks[idx])
-            
-            if self.tasks[real_idx]["crossed"]:
-                self.tasks[real_idx]["crossed"] = False
-                if "completed_date" in self.tasks[real_idx]:
-                    del self.tasks[real_idx]["completed_date"]
-                self.save_tasks()
-                self.listbox_load()
-                self.status_label.config(text=f"🔄 Reopened: {self.tasks[real_idx]['text']}")
+            tasks = self.selected_tasks()
+            if not tasks:
+                raise IndexError
+            changed = self.update_tasks(tasks, lambda task: set_completed(task, False), "Reopen")
+            if changed:
+                text = f"🔄 Reopened: {changed[0]['text']}" if len(changed) == 1 else f"🔄 Reopened {len(changed)} tasks"
+                self.status_label.config(text=text)
                 self.after(3000, lambda: self.status_label.config(text="Ready"))
             else:
-                msg.showinfo("Not Completed", "This task is not marked as completed.")
+                msg.showinfo("Not Completed", "The selected task(s) are not marked as completed.")
                 
-            self.todo_display_listbox.selection_clear(0, tk.END)
+            self.task_list.selection_clear()
         except IndexError:
             msg.showwarning(title="WARNING", message="Select a task to reopen.")
         except Exception as e:
             print(colored(f"UNCROSS EVENT ERROR: {e}", "yellow"))
 
+    def set_selected_field(self, field, value):
+        """Set priority or category on every selected task"""
+        tasks = self.selected_tasks()
+        if not tasks:
+            msg.showwarning(title="WARNING", message=f"Select tasks to change their {field}.")
+            return
+
+        def change(task):
+            if task.get(field) == value:
+                return False
+            task[field] = value
+            task["modified"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            return True
+
+        changed = self.update_tasks(tasks, change, f"Set {field} to {value}")
+        icon = "🎯" if field == "priority" else "📂"
+        self.status_label.config(text=f"{icon} Set {field} to {value} on {len(changed)} task(s)")
+        self.after(3000, lambda: self.status_label.config(text="Ready"))
+
+    def update_tasks(self, tasks, change, label):
+        """Apply ``change(task) -> changed?`` to copies of tasks as one batch.
+
+        Everything changed goes to the store in a single update, so a batch
+        costs one journal record, one save, one undo entry and one redraw.
+        Stored dicts are never edited in place: the persistence thread may
+        be reading them for an export.
+        """
+        before = {}
+        changed = []
+        for task in tasks:
+            updated = dict(task)
+            if change(updated):
+                before[task["id"]] = task
+                changed.append(updated)
+        if changed:
+            if self.persist(self.store.update_many, changed):
+                self.undo_log.record(f"{label} {len(changed)} task(s)", before)
+            self.listbox_load()
+        return changed
+
+    def record_deletion(self, label, tasks, positions):
+        """Remember deleted tasks and where they stood, so undo puts them back in place"""
+        self.undo_log.record(label, {task["id"]: task for task in tasks}, positions)
+
+    def undo(self):
+        """Revert the most recent change (Ctrl+Z)"""
+        self.step_history(self.undo_log.undo, "↶ Undid", "Nothing to undo")
+
+    def redo(self):
+        """Re-apply the most recently undone change (Ctrl+Y)"""
+        self.step_history(self.undo_log.redo, "↷ Redid", "Nothing to redo")
+
+    def step_history(self, step, verb, empty_text):
+        try:
+            entry = step(self.store)
+        except Exception as e:
+            print(colored(f"UNDO ERROR: {e}", "red"))
+            msg.showerror("Undo Error", f"Could not apply the change: {e}")
+            return
+        if entry is None:
+            self.status_label.config(text=empty_text)
+        else:
+            for task_id in entry.states:
+                self.render_cache.discard(task_id)
+            self.schedule_save()
+            self.listbox_load()
+            self.status_label.config(text=f"{verb}: {entry.label}")
+        self.after(3000, lambda: self.status_label.config(text="Ready"))
+
+    def delete_tasks(self):
+        """Delete the selection, or the completed tasks when nothing is selected"""
+        if self.task_list.selection():
+            self.delete_selected()
+        else:
+            self.delete_crossed_item()
+
+    def delete_selected(self):
+        """Delete every selected task after one confirmation"""
+        tasks = self.selected_tasks()
+        if not tasks:
+            msg.showwarning(title="WARNING", message="Select tasks to delete.")
+            return
+        task_list = "\n".join([f"• {t['text']}" for t in tasks[:10]])
+        if len(tasks) > 10:
+            task_list += f"\n... and {len(tasks) - 10} more tasks"
+        if msg.askyesno("Confirm Deletion", f"Delete {len(tasks)} selected task(s)?\n\n{task_list}"):
+            for task in tasks:
+                self.render_cache.discard(task["id"])
+            positions = self.store.positions([task["id"] for task in tasks])
+            if self.persist(self.store.delete, tasks):
+                self.record_deletion(f"Delete {len(tasks)} task(s)", tasks, positions)
+            self.listbox_load()
+            self.status_label.config(text=f"🗑 Deleted {len(tasks)} task(s)")
+            self.after(3000, lambda: self.status_label.config(text="Ready"))
+
+    def show_context_menu(self, event):
+        """Right-click menu with batch actions for the selection"""
+        row = self.task_list.row_at(event.y)
+        if row is None:
+            return
+        if row not in self.task_list.selected:
+            self.task_list.select_rows({row})
+        if self.context_menu is None:
+            self.context_menu = self.create_batch_menu(self)
+        self.context_menu.tk_popup(event.x_root, event.y_root)
+
+    def create_batch_menu(self, parent):
+        """Complete/reopen/delete plus priority and category submenus"""
+        menu = tk.Menu(parent, tearoff=0)
+        menu.add_command(label="Complete", command=self.cross_item, accelerator="Space")
+        menu.add_command(label="Reopen", command=self.uncross_item)
+        priority_menu = tk.Menu(menu, tearoff=0)
+        for priority in PRIORITIES:
+            priority_menu.add_command(label=f"{self.get_priority_icon(priority)} {priority}",
+                                      command=lambda p=priority: self.set_selected_field("priority", p))
+        menu.add_cascade(label="Set Priority", menu=priority_menu)
+        category_menu = tk.Menu(menu, tearoff=0)
+        for category in CATEGORIES:
+            category_menu.add_command(label=f"{self.get_category_icon(category)} {category}",
+                                      command=lambda c=category: self.set_selected_field("category", c))
+        menu.add_cascade(label="Set Category", menu=category_menu)
+        menu.add_separator()
+        menu.add_command(label="Delete Selected", command=self.delete_selected, accelerator="Delete")
+        return menu
+
     def edit_task(self):
         """Enhanced edit task dialog with notes support"""
         try:
-            idx = self.todo_display_listbox.curselection()[0]
-            tasks = self.get_filtered_and_sorted_tasks()
-            real_idx = self.tasks.index(tasks[idx])
-            current = self.tasks[real_idx]
+            idx, current = self.selected_task()
             
             # Create modern edit dialog
             popup = tk.Toplevel(self)
-            popup.geometry("700x500")
+            popup.geometry("700x580")
             popup.transient(self)
-            popup.title(f"Edit Task #{real_idx + 1}")
+            popup.title(f"Edit Task #{idx + 1}")
             popup.configure(bg="#ecf0f1")
             popup.resizable(False, False)
 
@@ -894,6 +1720,15 @@ class ModernTodoApp(tk.Tk):
             due_entry.insert(0, current.get("due", ""))
             due_entry.pack(anchor='w', pady=(5, 15))
 
+            # Repeat rule
+            tk.Label(main_frame, text="Repeat (e.g. weekly, every mon,thu, monthly on the 1st):", 
+                    font=("Segoe UI", 12, "bold"), 
+                    bg="#ecf0f1", fg="#2c3e50").pack(anchor='w')
+            repeat_var = tk.StringVar(value=current.get("repeat", ""))
+            repeat_menu = ttk.Combobox(main_frame, textvariable=repeat_var, 
+                                     values=REPEAT_CHOICES, width=30)
+            repeat_menu.pack(anchor='w', pady=(5, 15))
+
             # Notes
             tk.Label(main_frame, text="Notes:", 
                     font=("Segoe UI", 12, "bold"), 
@@ -915,22 +1750,31 @@ class ModernTodoApp(tk.Tk):
                     msg.showwarning("Input Error", "Task cannot be empty.")
                     return
                     
-                if new_due:
-                    try:
-                        datetime.strptime(new_due, "%Y-%m-%d")
-                    except ValueError:
-                        msg.showwarning("Date Error", "Due date must be in YYYY-MM-DD format.")
-                        return
+                try:
+                    new_due = parse_due(new_due)
+                except ValueError:
+                    msg.showwarning("Date Error", "Due date must be in YYYY-MM-DD format.")
+                    return
+                new_repeat = repeat_var.get().strip()
+                try:
+                    if new_repeat:
+                        parse_recurrence(new_repeat)
+                except ValueError as e:
+                    msg.showwarning("Repeat Error", str(e))
+                    return
                 
-                # Update task
-                self.tasks[real_idx]["text"] = new_text
-                self.tasks[real_idx]["priority"] = new_priority
-                self.tasks[real_idx]["category"] = new_category
-                self.tasks[real_idx]["due"] = new_due
-                self.tasks[real_idx]["notes"] = new_notes
-                self.tasks[real_idx]["modified"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                # Update a copy; the stored task may be mid-export
+                updated = dict(current)
+                updated["text"] = new_text
+                updated["priority"] = new_priority
+                updated["category"] = new_category
+                updated["due"] = new_due
+                updated["notes"] = new_notes
+                set_recurrence(updated, new_repeat)
+                updated["modified"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 
-                self.save_tasks()
+                if self.persist(self.store.update, updated):
+                    self.undo_log.record(f"Edit '{new_text}'", {current["id"]: current})
                 self.listbox_load()
                 popup.destroy()
                 
@@ -965,104 +1809,91 @@ class ModernTodoApp(tk.Tk):
 
     def delete_crossed_item(self):
         """Delete completed tasks with enhanced confirmation"""
-        completed_tasks = [i for i, t in enumerate(self.tasks) if t.get("crossed", False)]
+        completed_tasks = self.store.completed_tasks()
         
         if not completed_tasks:
             msg.showinfo("No Completed Tasks", "No completed tasks to delete.")
             return
         
         # Show detailed confirmation dialog
-        task_list = "\n".join([f"• {self.tasks[i]['text']}" for i in completed_tasks[:10]])
+        task_list = "\n".join([f"• {t['text']}" for t in completed_tasks[:10]])
         if len(completed_tasks) > 10:
             task_list += f"\n... and {len(completed_tasks) - 10} more tasks"
         
         confirm_msg = f"Delete {len(completed_tasks)} completed task(s)?\n\n{task_list}"
         
         if msg.askyesno("Confirm Deletion", confirm_msg):
-            # Delete in reverse order to avoid index shift
-            for i in reversed(completed_tasks):
-                print(colored(f"DELETED TASK: {self.tasks[i]['text']}", "red"))
-                del self.tasks[i]
+            for task in completed_tasks:
+                print(colored(f"DELETED TASK: {task['text']}", "red"))
+                self.render_cache.discard(task["id"])
             
-            self.save_tasks()
+            positions = self.store.positions([task["id"] for task in completed_tasks])
+            if self.persist(self.store.delete, completed_tasks):
+                self.record_deletion(f"Delete {len(completed_tasks)} completed task(s)", completed_tasks, positions)
             self.listbox_load()
             self.status_label.config(text=f"🗑 Deleted {len(completed_tasks)} completed tasks")
             self.after(3000, lambda: self.status_label.config(text="Ready"))
 
     def clear_list(self):
         """Clear all tasks with enhanced confirmation"""
-        if not self.tasks:
+        total_tasks = self.store.count()
+        if not total_tasks:
             msg.showinfo("Empty List", "Task list is already empty.")
             return
             
-        confirm_msg = f"This will permanently delete all {len(self.tasks)} tasks.\n\nThis action cannot be undone!"
+        confirm_msg = f"This will delete all {total_tasks} tasks.\n\nYou can bring them back with Undo (Ctrl+Z)."
         
         if msg.askyesno("Clear All Tasks", confirm_msg):
-            self.tasks.clear()
-            self.save_tasks()
+            tasks = self.store.all()
+            positions = self.store.positions([task["id"] for task in tasks])
+            if self.persist(self.store.clear):
+                self.record_deletion(f"Clear all {total_tasks} tasks", tasks, positions)
+            self.render_cache.records.clear()
             self.listbox_load()
             self.status_label.config(text="🧹 All tasks cleared")
             self.after(3000, lambda: self.status_label.config(text="Ready"))
 
     def clear_completed(self):
         """Clear only completed tasks"""
-        completed_count = len([t for t in self.tasks if t.get("crossed", False)])
+        completed_tasks = self.store.completed_tasks()
+        completed_count = len(completed_tasks)
         
         if completed_count == 0:
             msg.showinfo("No Completed Tasks", "No completed tasks to clear.")
             return
             
         if msg.askyesno("Clear Completed", f"Delete {completed_count} completed task(s)?"):
-            self.tasks = [t for t in self.tasks if not t.get("crossed", False)]
-            self.save_tasks()
+            for task in completed_tasks:
+                self.render_cache.discard(task["id"])
+            positions = self.store.positions([task["id"] for task in completed_tasks])
+            if self.persist(self.store.delete, completed_tasks):
+                self.record_deletion(f"Clear {completed_count} completed task(s)", completed_tasks, positions)
             self.listbox_load()
             self.status_label.config(text=f"🗑✅ Cleared {completed_count} completed tasks")
             self.after(3000, lambda: self.status_label.config(text="Ready"))
 
     def get_filtered_and_sorted_tasks(self):
-        """Get the currently displayed tasks (after filter/sort), for mapping to the main list."""
-        filter_text = self.search_var.get().lower()
-        show_completed = self.show_completed_var.get()
-        tasks = self.tasks
-        
-        # Filtering
-        if filter_text and filter_text != "search tasks...":
-            tasks = [t for t in tasks if (
-                filter_text in t["text"].lower() or
-                filter_text in t.get("category", "").lower() or
-                filter_text in t.get("priority", "").lower()
-            )]
-            
-        # Show/hide completed
-        if not show_completed:
-            tasks = [t for t in tasks if not t.get("crossed", False)]
-            
-        # Sorting
-        if self.sort_by == "priority":
-            tasks.sort(key=lambda t: PRIORITIES.index(t.get("priority", "Medium")))
-        elif self.sort_by == "date":
-            tasks.sort(key=lambda t: t.get("due") or "9999-99-99")
-        elif self.sort_by == "category":
-            tasks.sort(key=lambda t: t.get("category", "Other"))
-        elif self.sort_by == "created":
-            tasks.sort(key=lambda t: t.get("created", ""))
-        elif self.sort_by == "crossed":
-            tasks.sort(key=lambda t: t.get("crossed", False))
-            
-        return tasks
+        """Get the currently displayed tasks (after filter/sort) from the cached view model."""
+        return self.view.rows(self.search_text(), self.show_completed_var.get(), self.sort_by)
+
+    def selected_task(self):
+        """Return (row, task) for the listbox selection; IndexError if nothing is selected"""
+        idx = self.task_list.selection()[0]
+        return idx, self.view.task_at(idx)
+
+    def selected_tasks(self):
+        """Tasks behind every selected row, in display order"""
+        return [self.view.task_at(row) for row in self.task_list.selection()]
 
     def show_task_details(self):
         """Show detailed view of selected task"""
         try:
-            idx = self.todo_display_listbox.curselection()[0]
-            tasks = self.get_filtered_and_sorted_tasks()
-            real_idx = self.tasks.index(tasks[idx])
-            task = self.tasks[real_idx]
+            idx, task = self.selected_task()
             
             # Create details dialog
             details = tk.Toplevel(self)
             details.geometry("500x600")
-            details.title(f"Task Details - #{real_idx + 1}")
+            details.title(f"Task Details - #{idx + 1}")
             details.configure(bg="#ecf0f1")
             details.transient(self)
             
@@ -1081,13 +1912,19 @@ class ModernTodoApp(tk.Tk):
             info_frame = tk.Frame(main_frame, bg="#ffffff", relief='solid', borderwidth=1)
             info_frame.pack(fill=tk.X, pady=10)
             
+            repeat_info = ""
+            if task.get("repeat"):
+                # Just the next few dates; the series itself is never stored
+                upcoming = ", ".join(upcoming_occurrences(task, UPCOMING_OCCURRENCES))
+                repeat_info = f"🔁 Repeats: {task['repeat']}\n⏭ Next: {upcoming}\n"
+
             details_text = f"""
 📝 Task: {task['text']}
 
 🔴 Priority: {task.get('priority', 'Medium')}
 📂 Category: {task.get('category', 'Other')}
 📅 Due Date: {task.get('due', 'No date set')}
-📊 Status: {'✅ Completed' if task.get('crossed') else '⏳ Pending'}
+{repeat_info}📊 Status: {'✅ Completed' if task.get('crossed') else '⏳ Pending'}
 
 📝 Created: {task.get('created', 'Unknown')}
 {f"✅ Completed: {task.get('completed_date', 'Unknown')}" if task.get('crossed') else ""}
@@ -1133,13 +1970,17 @@ class ModernTodoApp(tk.Tk):
         file_menu.add_command(label="Import Tasks", command=self.import_tasks)
         file_menu.add_command(label="Export Tasks", command=self.export_tasks)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
         
         # Edit menu
         edit_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Edit", menu=edit_menu)
+        edit_menu.add_command(label="Undo", command=self.undo, accelerator="Ctrl+Z")
+        edit_menu.add_command(label="Redo", command=self.redo, accelerator="Ctrl+Y")
+        edit_menu.add_separator()
         edit_menu.add_command(label="Edit Task", command=self.edit_task, accelerator="F2")
         edit_menu.add_command(label="Complete Task", command=self.cross_item, accelerator="Space")
+        edit_menu.add_cascade(label="Selected Tasks", menu=self.create_batch_menu(edit_menu))
         edit_menu.add_separator()
         edit_menu.add_command(label="Clear Completed", command=self.clear_completed)
         edit_menu.add_command(label="Clear All", command=self.clear_list)
@@ -1155,6 +1996,9 @@ class ModernTodoApp(tk.Tk):
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="Keyboard Shortcuts", command=self.show_shortcuts)
+        help_menu.add_command(label="Search Syntax", command=self.show_search_syntax)
+        help_menu.add_command(label="Startup Timing", command=self.show_startup_timing)
+        help_menu.add_command(label="Performance", command=self.show_performance)
         help_menu.add_command(label="About", command=self.show_about)
 
     def show_shortcuts(self):
@@ -1163,11 +2007,16 @@ class ModernTodoApp(tk.Tk):
 Keyboard Shortcuts:
 
 Ctrl+N       - Focus on new task entry
-Ctrl+S       - Save tasks
+Ctrl+S       - Save snapshot of tasks
+Ctrl+Z       - Undo last change
+Ctrl+Y       - Redo
 Ctrl+F       - Focus on search
 F2           - Edit selected task
-Space        - Complete/Incomplete task
-Delete       - Delete completed tasks
+Space        - Complete selected tasks
+Delete       - Delete selected (or completed) tasks
+Ctrl+A       - Select all tasks in the list
+Ctrl/Shift+Click - Select several tasks
+Right-click  - Batch actions for the selection
 Enter        - Add new task (when in entry box)
 Double-click - Edit task
         """
@@ -1187,6 +2036,77 @@ Double-click - Edit task
         text_widget.insert('1.0', shortcuts_text.strip())
         text_widget.config(state='disabled')
 
+    def show_search_syntax(self):
+        """Explain the filters the search box understands"""
+        msg.showinfo("Search Syntax", """
+Words and "exact phrases" match task text, notes, category and priority.
+Everything you type must match.
+
+priority:High       - also priority:>=high, priority:<medium
+category:Work       - names may be shortened, e.g. category:sh
+due:2026-11-01      - also due:<2026-11-01, due:>=today, due:none
+done                - completed tasks; is:open for the rest
+-term               - excludes matches, e.g. -done or -"some phrase"
+
+While searching, Sort by Relevance puts the best word matches first.
+
+Example: priority:High category:Work due:<2026-11-01 -done "exact phrase"
+        """)
+
+    def show_performance(self):
+        """Per-handler call counts, latency histograms and rows rendered"""
+        window = tk.Toplevel(self)
+        window.title("Performance")
+        window.geometry("720x480")
+        window.configure(bg="#ecf0f1")
+        window.transient(self)
+
+        text_widget = tk.Text(window,
+                            font="TkFixedFont",
+                            bg="#ffffff",
+                            fg="#2c3e50",
+                            wrap=tk.NONE)
+
+        def refresh():
+            text_widget.config(state='normal')
+            text_widget.delete('1.0', tk.END)
+            text_widget.insert('1.0', self.perf.report())
+            text_widget.config(state='disabled')
+
+        def reset():
+            self.perf.reset()
+            refresh()
+
+        button_frame = tk.Frame(window, bg="#ecf0f1")
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=(0, 15))
+        for text, color, command in (("🔄 Refresh", "#3498db", refresh),
+                                     ("💾 Export JSON", "#27ae60", self.export_performance),
+                                     ("♻ Reset", "#e67e22", reset),
+                                     ("❌ Close", "#95a5a6", window.destroy)):
+            tk.Button(button_frame, text=text, command=command,
+                      bg=color, fg="#ffffff", font=("Segoe UI", 11, "bold"),
+                      relief='flat', cursor="hand2").pack(side=tk.LEFT, padx=5)
+        text_widget.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        refresh()
+
+    def export_performance(self):
+        """Save the handler timings as JSON for offline comparison"""
+        try:
+            from tkinter import filedialog
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json")]
+            )
+            if file_path:
+                self.perf.export(file_path, {"tasks": self.store.count(),
+                                             "backend": type(self.store).__name__,
+                                             "startup_ms": round(self.startup.elapsed(), 1)})
+                self.status_label.config(text=f"💾 Performance data saved to {file_path}")
+                self.after(3000, lambda: self.status_label.config(text="Ready"))
+        except Exception as e:
+            print(colored(f"Error exporting performance data: {e}", "red"))
+            msg.showerror("Export Error", f"Could not export performance data: {e}")
+
     def show_about(self):
         """Display about dialog"""
         about_text = """
@@ -1214,11 +2134,8 @@ Features:
     def run(self):
         """Start the application"""
         try:
-            # Create menu bar
-            self.create_menu_bar()
-            
             # Show welcome message for first-time users
-            if not self.tasks:
+            if not self.store.count():
                 self.status_label.config(text="👋 Welcome! Start by adding your first task above.")
             
             # Start the main loop
@@ -1240,4 +2157,7 @@ def main():
             msg.showerror("Fatal Error", f"Application failed to start: {e}")
 
 if __name__ == '__main__':
+    # Banner only when launched, so headless tools importing this module stay quiet
+    print(colored('Hello World!', 'red'))
+    print(colored('Success!', 'green'))
     main()
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""Headless benchmarks for the to-do list hot paths.
+
+Generates synthetic task sets, times each operation (best of --repeat runs)
+and records its peak traced memory. Results can be saved as a baseline and
+later runs compared against it:
+
+    python bench_todo.py --sizes 1000 10000 --save-baseline bench_baseline.json
+    python bench_todo.py --sizes 1000 10000 --baseline bench_baseline.json
+
+The exit status is 1 when any operation regressed past --threshold.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from todo_engine import (
+    CATEGORIES, PRIORITIES, SORT_KEYS, JsonTaskStore, SqliteTaskStore,
+    TaskImporter, TaskViewModel, validate_task_structure,
+)
+
+try:
+    # The render cache lives with the GUI; importing tkinter needs no display
+    from T2 import RenderCache
+except ImportError:
+    RenderCache = None
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+VISIBLE_ROWS = 60  # rows a virtualized listbox renders per refresh
+EDITS_PER_SAVE = 100
+NOISE_FLOOR_MS = 1.0  # differences smaller than this are never regressions
+WORDS = ("buy", "call", "write", "review", "plan", "fix", "book", "pay", "email", "clean",
+         "report", "groceries", "dentist", "invoice", "meeting", "garden", "taxes", "car",
+         "birthday", "slides", "budget", "flight", "doctor", "library", "project")
+
+
+def generate_tasks(count, seed=1):
+    """Deterministic synthetic tasks with a realistic mix of fields"""
+    rng = random.Random(seed)
+    today = date.today()
+    tasks = []
+    for i in range(count):
+        due = ""
+        if rng.random() < 0.7:
+            due = (today + timedelta(days=rng.randint(-60, 120))).isoformat()
+        tasks.append({
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))) + f" #{i}",
+            "crossed": rng.random() < 0.3,
+            "priority": rng.choice(PRIORITIES),
+            "category": rng.choice(CATEGORIES),
+            "due": due,
+            "created": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 09:00:00",
+            "notes": "" if rng.random() < 0.8 else " ".join(rng.choice(WORDS) for _ in range(8)),
+        })
+    validate_task_structure(tasks)
+    return tasks
+
+
+class BenchContext:
+    """A working directory holding one persisted task set for a backend"""
+
+    def __init__(self, folder, backend, tasks):
+        self.folder = folder
+        self.backend = backend
+        self.tasks = tasks
+        self.json_file = os.path.join(folder, "todo.json")
+        self.db_file = os.path.join(folder, "todo.db")
+        self._loaded = None
+        store = self.make_store()
+        store.load()
+        store.extend([dict(t) for t in tasks])
+        store.save()
+        store.close()
+
+    def make_store(self):
+        if self.backend == "sqlite":
+            return SqliteTaskStore(self.db_file, self.json_file)
+        return JsonTaskStore(self.json_file)
+
+    def loaded_store(self):
+        """A store loaded once and shared by the read-mostly benchmarks"""
+        if self._loaded is None:
+            self._loaded = self.make_store()
+            self._loaded.load()
+        return self._loaded
+
+    def close(self):
+        if self._loaded is not None:
+            self._loaded.close()
+            self._loaded = None
+
+
+# Each benchmark does its setup and returns the callable that gets timed
+
+def bench_load_tasks(ctx):
+    def run():
+        store = ctx.make_store()
+        store.load()
+        store.close(compact=False)
+    return run
+
+
+def bench_filter_and_sort(ctx):
+    store = ctx.loaded_store()
+
+    def run():
+        for sort_by in SORT_KEYS:
+            store.query("", True, sort_by)
+        store.query("report", False, "priority")
+    return run
+
+
+def bench_view_rows_and_render(ctx):
+    if RenderCache is None:
+        return None
+    store = ctx.loaded_store()
+    today = date.today()
+
+    def run():
+        # A fresh view and cache model the first refresh after a filter change
+        view = TaskViewModel(store)
+        cache = RenderCache()
+        cache.set_day(today)
+        rows = view.rows("", True, "date")
+        for task in rows[:VISIBLE_ROWS]:
+            cache.record(task)
+        store.count()
+        store.count_completed()
+        store.count_overdue(today.isoformat())
+    return run
+
+
+def bench_count_overdue(ctx):
+    store = ctx.loaded_store()
+    today = date.today().isoformat()
+    return lambda: store.count_overdue(today)
+
+
+def bench_save_tasks(ctx):
+    store = ctx.loaded_store()
+    rng = random.Random(2)
+
+    def run():
+        for task_id in rng.sample([t["id"] for t in ctx.tasks], min(EDITS_PER_SAVE, len(ctx.tasks))):
+            # Edit a copy, as the GUI does; stored dicts may be mid-export
+            task = dict(store.get(task_id))
+            task["crossed"] = not task.get("crossed", False)
+            store.update(task)
+        store.save()
+    return run
+
+
+def bench_import_tasks(ctx):
+    store = ctx.loaded_store()
+    # A tenth of the list, half of it already present
+    fresh = generate_tasks(max(1, len(ctx.tasks) // 20), seed=3)
+    import_file = os.path.join(ctx.folder, "import.jsonl")
+    with open(import_file, "w") as f:
+        for task in ctx.tasks[:len(fresh)] + fresh:
+            f.write(json.dumps(task) + "\n")
+    existing = store.all()
+    return lambda: TaskImporter(existing).run(import_file)
+
+
+BENCHMARKS = [
+    ("load_tasks", bench_load_tasks),
+    ("get_filtered_and_sorted_tasks", bench_filter_and_sort),
+    ("view_rows_and_render", bench_view_rows_and_render),
+    ("count_overdue_tasks", bench_count_overdue),
+    ("save_tasks", bench_save_tasks),
+    ("import_tasks", bench_import_tasks),
+]
+
+
+def measure(run, repeat):
+    """Return (best wall time in ms, peak traced memory in KiB)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1024
+
+
+def run_benchmarks(backend, sizes, repeat, only=None):
+    results = {}
+    for size in sizes:
+        tasks = generate_tasks(size)
+        with tempfile.TemporaryDirectory() as folder:
+            ctx = BenchContext(folder, backend, tasks)
+            try:
+                for name, bench in BENCHMARKS:
+                    if only and name not in only:
+                        continue
+                    run = bench(ctx)
+                    if run is None:
+                        print(f"  skipping {name}: tkinter is not available", file=sys.stderr)
+                        continue
+                    ms, kib = measure(run, repeat)
+                    results[f"{backend}/{size}/{name}"] = {"ms": round(ms, 3), "peak_kib": round(kib, 1)}
+                    print(f"{backend:<7}{size:>9}  {name:<32}{ms:>12.2f} ms{kib:>14.1f} KiB", flush=True)
+            finally:
+                ctx.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print regressions against a baseline and return how many there were"""
+    regressions = 0
+    for key, current in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric, unit in (("ms", "ms"), ("peak_kib", "KiB")):
+            old, new = previous[metric], current[metric]
+            if metric == "ms" and new - old < NOISE_FLOOR_MS:
+                continue
+            if old and new > old * (1 + threshold):
+                regressions += 1
+                print(f"REGRESSION {key} {metric}: {old:.2f} -> {new:.2f} {unit} (+{(new / old - 1):.0%})")
+    if not regressions:
+        print(f"No regressions above {threshold:.0%} against the baseline")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the to-do list hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="task counts to generate, e.g. 1000 10000 100000 1000000")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per operation; the best is kept")
+    parser.add_argument("--only", nargs="+", choices=[name for name, _ in BENCHMARKS])
+    parser.add_argument("--baseline", help="JSON file of earlier results to compare against")
+    parser.add_argument("--save-baseline", help="write these results to a JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown that counts as a regression (default 0.25)")
+    args = parser.parse_args(argv)
+
+    print(f"{'backend':<7}{'tasks':>9}  {'operation':<32}{'best time':>15}{'peak memory':>18}")
+    results = run_benchmarks(args.backend, args.sizes, max(1, args.repeat), args.only)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,627 @@
+"""Headless tests for todo_engine: the shared task journal, repeat rules, search and both task stores (run with python -m unittest or pytest)"""
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from todo_engine import (
+    LAST_DUE_KEY, NO_DUE_KEY, PRIORITY_RANK, RELEVANCE_SORT, DuplicateIndex, FullTextIndex, JsonTaskStore,
+    SqliteTaskStore, TaskCounters, TaskExporter, TaskImporter, TaskStore, UndoLog, create_task, new_task_id,
+    parse_query, parse_recurrence, set_completed,
+)
+
+
+class JournalSharingTest(unittest.TestCase):
+    """Two JsonTaskStores on one data file, as two running instances would be"""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.folder.name, "todo.json")
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close(compact=False)
+        self.folder.cleanup()
+
+    def open_store(self):
+        store = JsonTaskStore(self.data_file)
+        store.load()
+        self.stores.append(store)
+        return store
+
+    def on_disk(self):
+        """Tasks a freshly started instance would see"""
+        store = JsonTaskStore(self.data_file)
+        store.load()
+        tasks = {task["id"]: task for task in store.all()}
+        store.close(compact=False)
+        return tasks
+
+    @staticmethod
+    def tasks_of(store):
+        return {task["id"]: task for task in store.all()}
+
+    @staticmethod
+    def catch_up(store):
+        store.poll_external()
+        return store.merge_external()
+
+    def assert_in_sync(self, *stores):
+        expected = self.on_disk()
+        for store in stores:
+            self.assertEqual(self.tasks_of(store), expected)
+
+    def test_interleaved_put_and_remove(self):
+        a, b = self.open_store(), self.open_store()
+        a.extend([create_task(f"task {i}") for i in range(6)])
+        a.save()
+        self.assertTrue(self.catch_up(b))
+        self.assertEqual(b.count(), 6)
+        first, second, third = a.all()[:3]
+
+        edited = dict(b.get(first["id"]))
+        edited["text"] = "edited by b"
+        b.update(edited)
+        b.delete([b.get(second["id"])])
+        b.save()
+        a.delete([a.get(third["id"])])
+        a.add(create_task("added by a"))
+        a.save()
+        # a's flush read b's records first, so only b has anything left to merge
+        self.assertTrue(self.catch_up(a))
+        self.assertTrue(self.catch_up(b))
+
+        self.assert_in_sync(a, b)
+        self.assertEqual(a.get(first["id"])["text"], "edited by b")
+        self.assertIsNone(a.get(second["id"]))
+        self.assertIsNone(b.get(third["id"]))
+        self.assertEqual(a.count(), 5)
+
+    def test_unsaved_local_edit_wins_over_older_external_one(self):
+        a, b = self.open_store(), self.open_store()
+        a.add(create_task("shared"))
+        a.save()
+        self.catch_up(b)
+        task_id = a.all()[0]["id"]
+
+        theirs = dict(b.get(task_id))
+        theirs["text"] = "from b"
+        b.update(theirs)
+        b.save()
+        ours = dict(a.get(task_id))
+        ours["text"] = "from a"
+        a.update(ours)
+        self.catch_up(a)
+        self.assertEqual(a.get(task_id)["text"], "from a")
+
+        a.save()
+        self.catch_up(b)
+        self.assert_in_sync(a, b)
+
+    def test_compaction_while_other_store_lags(self):
+        a, b = self.open_store(), self.open_store()
+        a.extend([create_task(f"early {i}") for i in range(3)])
+        a.save()
+        self.catch_up(b)
+        for i in range(10):
+            a.add(create_task(f"while b is idle {i}"))
+            a.save()
+        a.journal.compact(wait=True)
+        a.add(create_task("after compaction"))
+        a.save()
+        self.assertTrue(a.journal.sealed_segments(folded=True))
+
+        with mock.patch.object(b.journal, "reload_records", wraps=b.journal.reload_records) as reload:
+            self.assertTrue(self.catch_up(b))
+        # The folded segment still holds what b missed, so it follows the tail
+        reload.assert_not_called()
+        self.assertEqual(b.count(), 14)
+        self.assert_in_sync(a, b)
+
+    def test_seq_gap_forces_full_reload(self):
+        a, b = self.open_store(), self.open_store()
+        a.add(create_task("seen by both"))
+        a.save()
+        self.catch_up(b)
+        for i in range(5):
+            a.add(create_task(f"folded away {i}"))
+            a.save()
+        a.journal.compact(wait=True)
+        # As if b stayed away past FOLDED_SEGMENT_SECONDS
+        for _, path in a.journal.sealed_segments(folded=True):
+            os.remove(path)
+        a.add(create_task("in the new journal"))
+        a.save()
+
+        with mock.patch.object(b.journal, "reload_records", wraps=b.journal.reload_records) as reload:
+            self.assertTrue(self.catch_up(b))
+        reload.assert_called()
+        self.assertEqual(b.count(), 7)
+        self.assert_in_sync(a, b)
+
+        b.add(create_task("written after the reload"))
+        b.save()
+        self.catch_up(a)
+        self.assert_in_sync(a, b)
+
+    def test_load_sweeps_expired_folded_segments(self):
+        a = self.open_store()
+        a.add(create_task("folded"))
+        a.close()
+        folded = [path for _, path in a.journal.sealed_segments(folded=True)]
+        self.assertTrue(folded)
+
+        self.open_store()
+        self.assertTrue(all(os.path.exists(path) for path in folded))
+        with mock.patch("todo_engine.FOLDED_SEGMENT_SECONDS", -1):
+            b = self.open_store()
+        self.assertFalse(any(os.path.exists(path) for path in folded))
+        self.assertEqual([task["text"] for task in b.all()], ["folded"])
+
+    def test_data_file_exists_throughout_snapshot_rewrites(self):
+        a = self.open_store()
+        journal = a.journal
+        seen = []
+        real_replace = os.replace
+
+        def replace(src, dst):
+            seen.append(os.path.exists(self.data_file))
+            real_replace(src, dst)
+            seen.append(os.path.exists(self.data_file))
+
+        # The second round runs as if on a filesystem without hard links
+        for link in (os.link, mock.Mock(side_effect=OSError)):
+            for i in range(journal.backups + 1):
+                with mock.patch("todo_engine.os.replace", replace), mock.patch("todo_engine.os.link", link):
+                    journal.write_snapshot([create_task(f"generation {i}")], i + 1)
+            self.assertTrue(seen and all(seen))
+            # Newest first, each backup one generation older than the last
+            generations = [journal.data_file] + journal.backup_files()
+            seqs = [journal.serializer.read(path)[1] for path in generations]
+            self.assertEqual(seqs, list(range(journal.backups + 1, 0, -1)))
+
+    def test_truncated_last_line(self):
+        a = self.open_store()
+        a.extend([create_task("kept"), create_task("also kept")])
+        a.save()
+        b = self.open_store()
+        journal_file = a.journal.journal_file
+        with open(journal_file, "ab") as f:
+            f.write(b'{"seq":99,"op":"put","tasks":[{"text":"torn')
+        # A follower waits for the rest of the line instead of failing
+        self.assertFalse(self.catch_up(b))
+        intact = os.path.getsize(journal_file) - len(b'{"seq":99,"op":"put","tasks":[{"text":"torn')
+
+        c = self.open_store()
+        self.assertEqual(sorted(t["text"] for t in c.all()), ["also kept", "kept"])
+        # Loading cut the torn tail, so the next record starts on a clean line
+        self.assertEqual(os.path.getsize(journal_file), intact)
+        c.add(create_task("after repair"))
+        c.save()
+        self.assertEqual(sorted(t["text"] for t in self.on_disk().values()), ["after repair", "also kept", "kept"])
+
+    def test_migrates_legacy_list_snapshot_and_journal(self):
+        legacy = [{"text": "first", "crossed": False, "priority": "High"},
+                  {"text": "second", "crossed": True},
+                  {"text": "third", "crossed": False}]
+        with open(self.data_file, "w") as f:
+            json.dump(legacy, f)
+        # Position-based records from before tasks had IDs
+        with open(f"{self.data_file}.journal", "w") as f:
+            f.write(json.dumps({"seq": 1, "op": "update", "index": 0,
+                                "task": {"text": "first, edited", "crossed": False}}) + "\n")
+            f.write(json.dumps({"seq": 2, "op": "delete", "indices": [1]}) + "\n")
+            f.write(json.dumps({"seq": 3, "op": "add", "task": {"text": "fourth", "crossed": False}}) + "\n")
+
+        store = self.open_store()
+        self.assertEqual([t["text"] for t in store.all()], ["first, edited", "third", "fourth"])
+        self.assertTrue(all(t.get("id") for t in store.all()))
+        self.assertIn("priority", store.all()[0])
+
+        # The assigned IDs were written straight to a new-format snapshot
+        tasks, seq = store.journal.serializer.read(self.data_file)
+        self.assertEqual(seq, 3)
+        self.assertEqual([t["id"] for t in tasks], [t["id"] for t in store.all()])
+        self.assertEqual(self.on_disk(), self.tasks_of(store))
+
+
+class SqliteMigrationTest(unittest.TestCase):
+
+    def test_migration_leaves_json_files_untouched(self):
+        with tempfile.TemporaryDirectory() as folder:
+            legacy_file = os.path.join(folder, "todo.json")
+            with open(legacy_file, "w") as f:
+                json.dump([{"text": "old task", "crossed": False}], f)
+            with open(f"{legacy_file}.journal", "w") as f:
+                f.write(json.dumps({"seq": 1, "op": "add", "task": {"text": "journaled", "crossed": True}}) + "\n")
+            before = {name: open(os.path.join(folder, name), "rb").read() for name in os.listdir(folder)}
+
+            store = SqliteTaskStore(os.path.join(folder, "todo.db"), legacy_file)
+            store.load()
+            self.assertEqual(sorted(t["text"] for t in store.all()), ["journaled", "old task"])
+            store.close()
+
+            after = {name: open(os.path.join(folder, name), "rb").read()
+                     for name in os.listdir(folder) if name.startswith("todo.json")}
+            self.assertEqual(after, before)
+
+
+class TaskStoreInterfaceTest(unittest.TestCase):
+
+    def test_incomplete_store_fails_when_created(self):
+        class ReadOnlyStore(TaskStore):
+            def load(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            ReadOnlyStore()
+
+
+class RecurrenceTest(unittest.TestCase):
+
+    def test_yearly_rule_returns_to_leap_day(self):
+        task = create_task("leap day", due="2028-02-29", repeat="yearly")
+        self.assertEqual(task["repeat"], "every year on feb 29")
+        dues = []
+        for _ in range(4):
+            set_completed(task, True)
+            dues.append(task["due"])
+        self.assertEqual(dues, ["2029-02-28", "2030-02-28", "2031-02-28", "2032-02-29"])
+
+    def test_yearday_forms(self):
+        for text in ("every year on feb 29", "yearly on february 29th", "annually on the 29th of feb"):
+            self.assertEqual(parse_recurrence(text).yearday, (2, 29))
+        with self.assertRaises(ValueError):
+            parse_recurrence("every year on feb 30")
+
+
+class QueryParsingTest(unittest.TestCase):
+
+    TODAY = date(2026, 10, 18)
+
+    def parse(self, text):
+        return parse_query(text, self.TODAY)
+
+    def ranges(self, text):
+        return [(f.mode, f.low, f.high, f.negated) for f in self.parse(text).filters]
+
+    def test_comparisons_become_key_ranges(self):
+        high, critical = PRIORITY_RANK["High"], PRIORITY_RANK["Critical"]
+        self.assertEqual(self.ranges("priority:>=high"), [("priority", high, None, False)])
+        self.assertEqual(self.ranges("priority:<crit"), [("priority", None, critical - 1, False)])
+        self.assertEqual(self.ranges("due:<2026-11-01"), [("date", None, "2026-10-31", False)])
+        self.assertEqual(self.ranges("due:>today"), [("date", "2026-10-19", LAST_DUE_KEY, False)])
+        self.assertEqual(self.ranges("due:none"), [("date", NO_DUE_KEY, NO_DUE_KEY, False)])
+        self.assertEqual(self.ranges("category:Work"), [("category", "Work", "Work", False)])
+        undated = create_task("someday")
+        self.assertFalse(self.parse("due:>today").matches(undated))
+        self.assertTrue(self.parse("due:none").matches(undated))
+
+    def test_negation_and_quoted_terms(self):
+        query = self.parse('-"Buy milk" Report -category:work done priority:')
+        self.assertEqual(query.terms, [("buy milk", True), ("report", False)])
+        self.assertEqual(self.ranges('-"Buy milk" Report -category:work done priority:'),
+                         [("category", "Work", "Work", True), ("crossed", True, True, False)])
+        self.assertEqual(query.ranked_text(), "report")
+        self.assertEqual(self.parse("see https://example.com").terms, [("see", False), ("https://example.com", False)])
+
+        task = create_task("Write report", category="Personal")
+        self.assertFalse(query.matches(task))
+        set_completed(task, True)
+        self.assertTrue(query.matches(task))
+        task["notes"] = "then buy milk"
+        self.assertFalse(query.matches(task))
+
+    def test_bad_filter_values_are_rejected(self):
+        for text in ("priority:urgent", "priority:>", "due:<soon", "due:>none", "category:>work", "is:maybe"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                self.parse(text)
+
+
+class FullTextIndexTest(unittest.TestCase):
+
+    def test_unknown_words_expand_as_prefixes(self):
+        index = FullTextIndex()
+        for i, text in enumerate(("Quarterly report", "Reporting meeting", "Repot the fern", "Meet Rebecca")):
+            index.add(dict(create_task(text), id=str(i)))
+        self.assertEqual(index.query_terms("repo"), {"report", "repot"})
+        self.assertEqual(index.query_terms("meeting"), {"meet"})
+        # Too short to guess at
+        self.assertEqual(index.query_terms("re"), set())
+        self.assertEqual(index.query_terms("zebra"), set())
+
+
+class DuplicateIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DuplicateIndex()
+
+    def similar(self, text, *others):
+        for i, other in enumerate(others):
+            self.index.add(i, other)
+        return self.index.similar(text)
+
+    def test_threshold_is_inclusive(self):
+        # Three shared words of five in all: a Jaccard similarity of exactly 0.6
+        self.assertEqual(self.similar("call bank about loan", "call bank about mortgage"), [0])
+        self.assertEqual(self.similar("call bank about loan today", "call bank about mortgage"), [])
+
+    def test_stopwords_and_spacing_do_not_count(self):
+        self.assertEqual(self.similar("Buy milk for the kids", "buy MILK   kids"), [0])
+        self.assertTrue(self.index.has_exact("  buy milk KIDS "))
+        # Identical text is an exact duplicate, not a similar one
+        self.assertEqual(self.index.similar("Buy milk kids"), [])
+        self.assertEqual(DuplicateIndex.words("to the"), frozenset(("to", "the")))
+
+    def test_most_similar_first_and_edits_are_tracked(self):
+        found = self.similar("pay gas bill", "pay gas and water bill online", "pay gas bill", "pay gas bill online")
+        self.assertEqual(found, [2, 0])
+        self.index.add(2, "walk the dog")
+        self.assertEqual(self.index.similar("pay gas bill"), [0])
+        self.index.discard(1)
+        self.assertFalse(self.index.has_exact("pay gas bill"))
+
+
+class TaskCountersTest(unittest.TestCase):
+
+    def task(self, due, crossed=False):
+        return dict(create_task(f"due {due or 'never'}", due=due), id=new_task_id(), crossed=crossed)
+
+    def test_open_tasks_become_overdue_as_days_pass(self):
+        counters = TaskCounters()
+        tasks = [self.task("2026-10-17"), self.task("2026-10-18"), self.task("2026-10-19"),
+                 self.task("2026-10-01", crossed=True), self.task("")]
+        counters.rebuild(tasks, "2026-10-18")
+        self.assertEqual(counters.count_overdue("2026-10-18"), 1)
+        self.assertEqual(counters.count_overdue("2026-10-19"), 2)
+        self.assertEqual(counters.count_overdue("2026-11-01"), 3)
+        # The clock going backwards brings tasks back from overdue
+        self.assertEqual(counters.count_overdue("2026-10-18"), 1)
+
+        late = self.task("2026-10-20")
+        counters.track(late)
+        late["crossed"] = True
+        counters.track(late)
+        self.assertEqual(counters.count_overdue("2026-10-21"), 3)
+        self.assertEqual(len(counters.completed), 2)
+        counters.untrack(tasks[0]["id"])
+        self.assertEqual(counters.count_overdue("2026-10-21"), 2)
+
+
+class StoreContract:
+    """Behavior both storage engines share; subclasses say how to open one"""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.store = self.open_store()
+        self.store.load()
+
+    def tearDown(self):
+        self.store.close(compact=False)
+        self.folder.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.folder.name, name)
+
+    def texts(self):
+        return sorted(task["text"] for task in self.store.all())
+
+    def write_records(self, name, records):
+        with open(self.path(name), "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        return self.path(name)
+
+    def test_import_skips_duplicates_added_while_it_ran(self):
+        self.store.add(create_task("already here"))
+        import_file = self.write_records("import.jsonl", [
+            {"text": "Already here"}, {"text": "new one"}, {"text": "new one"}, {"text": "typed meanwhile"},
+            {"text": ""}])
+        first = TaskImporter(self.store.all()).run(import_file)
+        second = TaskImporter(self.store.all()).run(import_file)
+        self.assertEqual((len(first.imported), first.duplicates, first.invalid), (2, 2, 1))
+
+        self.store.add(create_task("typed meanwhile"))
+        self.store.extend(first.new_tasks(self.store.all()))
+        # The second import started from the same snapshot as the first
+        self.store.extend(second.new_tasks(self.store.all()))
+        self.assertEqual(self.texts(), ["already here", "new one", "typed meanwhile"])
+        self.assertEqual(first.duplicates, 3)
+        self.assertEqual((second.imported, second.duplicates), ([], 4))
+
+    def test_duplicate_checks_do_not_wait_for_warm_up(self):
+        self.store.extend([create_task(f"errand number {i}") for i in range(1200)])
+        self.store.close(compact=False)
+        self.store = self.open_store()
+        self.store.load()
+        steps = self.store.warm_up()
+        next(steps)
+        with mock.patch.object(type(self.store), "duplicates", side_effect=AssertionError("built in one go")):
+            self.assertTrue(self.store.contains_text("Errand  number 1199"))
+            self.assertFalse(self.store.contains_text("errand number 1200"))
+            self.store.similar_tasks("errand number 7 today")
+        for _ in steps:
+            pass
+        similar = [task["text"] for task in self.store.similar_tasks("errand number 7 today")]
+        self.assertIn("errand number 7", similar)
+
+    def test_undone_delete_returns_tasks_to_their_place(self):
+        self.store.extend([create_task(text) for text in "abcdef"])
+        undo_log = UndoLog()
+        for texts in ("b", "de"):
+            tasks = [task for task in self.store.all() if task["text"] in texts]
+            positions = self.store.positions([task["id"] for task in tasks])
+            self.store.delete(tasks)
+            undo_log.record(f"Delete {texts}", {task["id"]: task for task in tasks}, positions)
+        self.store.add(create_task("g"))
+        undo_log.undo(self.store)
+        undo_log.undo(self.store)
+        in_order = lambda: [task["text"] for task in self.store.query("", sort_by="date")]
+        self.assertEqual(in_order(), list("abcdefg"))
+        self.assertEqual([task["text"] for task in self.store.all()], list("abcdefg"))
+
+        undo_log.redo(self.store)
+        undo_log.undo(self.store)
+        self.assertEqual(in_order(), list("abcdefg"))
+        self.store.close(compact=False)
+        self.store = self.open_store()
+        self.store.load()
+        self.assertEqual(in_order(), list("abcdefg"))
+
+    def test_unreadable_files_are_set_aside_for_a_fresh_store(self):
+        self.store.add(create_task("unreadable"))
+        self.store.close(compact=False)
+        for name in self.main_files():
+            if os.path.exists(self.path(name)):
+                with open(self.path(name), "wb") as f:
+                    f.write(b"\x00 not a task file \x00" * 64)
+        self.store = self.open_store()
+        with self.assertRaises(Exception):
+            self.store.load()
+
+        moved = self.store.set_aside()
+        self.assertTrue(moved)
+        self.assertTrue(all(".corrupt" in path and os.path.exists(path) for path in moved))
+        self.store = self.open_store()
+        self.store.load()
+        self.store.add(create_task("typed after the failure"))
+        self.store.close(compact=False)
+        self.store = self.open_store()
+        self.store.load()
+        self.assertEqual(self.texts(), ["typed after the failure"])
+
+    def test_search_terms_negations_and_filters(self):
+        self.store.extend([
+            create_task("Write quarterly report", "High", "Work", due="2026-10-20"),
+            create_task("Report the broken light", "Low", "Personal"),
+            create_task("Buy milk", "Medium", "Shopping", notes="and a quarterly magazine"),
+            create_task("Draft budget report", "Critical", "Work", due="2026-10-01"),
+        ])
+        done = next(task for task in self.store.all() if task["text"] == "Draft budget report")
+        set_completed(done, True)
+        self.store.update(done)
+        found = lambda text, show_completed=True: sorted(
+            task["text"] for task in self.store.query(text, show_completed))
+        self.assertEqual(found("report"), ["Draft budget report", "Report the broken light", "Write quarterly report"])
+        self.assertEqual(found("report", show_completed=False), ["Report the broken light", "Write quarterly report"])
+        self.assertEqual(found("report -quarterly -budget"), ["Report the broken light"])
+        self.assertEqual(found("quarterly"), ["Buy milk", "Write quarterly report"])
+        self.assertEqual(found('"quarterly report"'), ["Write quarterly report"])
+        self.assertEqual(found("report priority:>=high"), ["Draft budget report", "Write quarterly report"])
+        self.assertEqual(found("report -done"), ["Report the broken light", "Write quarterly report"])
+        self.assertEqual(found("is:done category:work"), ["Draft budget report"])
+        self.assertEqual(found("due:<2026-10-19"), ["Draft budget report"])
+        self.assertEqual(found("due:none -category:personal"), ["Buy milk"])
+        self.assertEqual(found("report milk"), [])
+
+    def test_relevance_ranks_by_bm25_and_expands_prefixes(self):
+        self.store.extend([create_task(text) for text in (
+            "Budget review with the finance team next week", "Budget budget", "Budget draft", "Lunch")])
+        ranked = lambda text: [task["text"] for task in self.store.query(text, sort_by=RELEVANCE_SORT)]
+        # More occurrences rank higher, and a longer task with one occurrence ranks lower
+        self.assertEqual(ranked("budget"), ["Budget budget", "Budget draft",
+                                            "Budget review with the finance team next week"])
+        self.assertEqual(ranked("budg"), ranked("budget"))
+        self.assertEqual(ranked("budget draft")[0], "Budget draft")
+        self.assertEqual(ranked("budget -draft")[0], "Budget budget")
+
+    def test_export_round_trips_through_import(self):
+        self.store.extend([
+            create_task("File taxes", "Critical", "Finance", due="2026-04-15", notes="bring receipts"),
+            create_task("Water plants", repeat="every 3 days", due="2026-10-18"),
+            create_task('Quote "this", then a comma'),
+        ])
+        done = self.store.all()[0]
+        set_completed(done, True)
+        self.store.update(done)
+        original = sorted(self.store.all(), key=lambda task: task["text"])
+        for extension in (".json", ".jsonl"):
+            with self.subTest(extension=extension):
+                export_file = self.path("export" + extension)
+                exporter = TaskExporter(self.store.all(), self.store.count())
+                exporter.run(export_file)
+                self.assertEqual(exporter.written, 3)
+                self.assertEqual(TaskImporter(self.store.all()).run(export_file).imported, [])
+
+                imported = TaskImporter([]).run(export_file).imported
+                self.assertEqual(sorted(imported, key=lambda task: task["text"]), original)
+
+    def test_undo_and_redo_replay_each_delta(self):
+        undo_log = UndoLog()
+        tasks = [create_task(text) for text in ("a", "b", "c")]
+        self.store.extend(tasks)
+        undo_log.record("Add tasks", {task["id"]: None for task in tasks})
+        before = dict(tasks[0])
+        edited = dict(tasks[0], text="a, edited", priority="High")
+        self.store.update(edited)
+        undo_log.record("Edit task", {before["id"]: before})
+        doomed = [self.store.get(tasks[1]["id"])]
+        positions = self.store.positions([tasks[1]["id"]])
+        self.store.delete(doomed)
+        undo_log.record("Delete task", {doomed[0]["id"]: doomed[0]}, positions)
+        in_order = lambda: [task["text"] for task in self.store.query("", sort_by="date")]
+        self.assertEqual(in_order(), ["a, edited", "c"])
+
+        self.assertEqual(undo_log.undo(self.store).label, "Delete task")
+        self.assertEqual(in_order(), ["a, edited", "b", "c"])
+        undo_log.undo(self.store)
+        self.assertEqual(self.store.get(tasks[0]["id"]), before)
+        undo_log.undo(self.store)
+        self.assertEqual(self.store.count(), 0)
+        self.assertIsNone(undo_log.undo(self.store))
+
+        for _ in range(3):
+            undo_log.redo(self.store)
+        self.assertEqual(in_order(), ["a, edited", "c"])
+        self.assertEqual(self.store.get(tasks[0]["id"])["priority"], "High")
+        self.assertIsNone(undo_log.redo(self.store))
+
+    def test_quick_repeated_edits_undo_together(self):
+        undo_log = UndoLog()
+        task = create_task("draft")
+        self.store.add(task)
+        for text in ("draft 2", "draft 3"):
+            before = self.store.get(task["id"])
+            self.store.update(dict(before, text=text))
+            undo_log.record("Edit task", {task["id"]: before})
+        undo_log.undo(self.store)
+        self.assertEqual(self.texts(), ["draft"])
+
+    def test_overdue_count_rolls_over_at_midnight(self):
+        self.store.extend([create_task(f"due {day}", due=day) for day in ("2026-10-17", "2026-10-18", "2026-10-19")]
+                          + [create_task("no date")])
+        self.assertEqual(self.store.count_overdue("2026-10-18"), 1)
+        self.assertEqual(self.store.count_overdue("2026-10-19"), 2)
+        self.assertEqual(self.store.count_overdue("2026-10-20"), 3)
+        task = next(task for task in self.store.all() if task["due"] == "2026-10-19")
+        set_completed(task, True)
+        self.store.update(task)
+        self.assertEqual(self.store.count_overdue("2026-10-20"), 2)
+        self.assertEqual(self.store.count_completed(), 1)
+        self.assertEqual(self.store.count_overdue("2026-10-17"), 0)
+
+
+class JsonStoreTest(StoreContract, unittest.TestCase):
+
+    def open_store(self):
+        return JsonTaskStore(self.path("todo.json"))
+
+    def main_files(self):
+        return ["todo.json"] + [os.path.basename(path) for path in self.store.journal.backup_files()]
+
+
+class SqliteStoreTest(StoreContract, unittest.TestCase):
+
+    def open_store(self):
+        return SqliteTaskStore(self.path("todo.db"), self.path("todo.json"))
+
+    def main_files(self):
+        return ["todo.db"]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Command-line front end for the to-do list; never imports tkinter."""
+import argparse
+import sys
+from datetime import date
+
+from todo_engine import (
+    CATEGORIES, PRIORITIES, RELEVANCE_SORT, SORT_KEYS, TaskExporter, colored,
+    create_task, open_task_store, set_completed,
+)
+
+
+def format_row(task, today):
+    """One line per task: short id, status, text, priority, category and due date"""
+    status = "✅" if task.get("crossed") else "📌"
+    line = f"{task['id'][:8]}  {status} {task['text']}  [{task.get('priority', 'Medium')} | {task.get('category', 'Other')}]"
+    due = task.get("due")
+    if due:
+        overdue = not task.get("crossed") and due < today
+        line += f"  due {due}" + (" ⚠ overdue" if overdue else "")
+    if task.get("repeat"):
+        line += f"  🔁 {task['repeat']}"
+    return line
+
+
+def find_task(store, id_prefix):
+    """Resolve a (possibly shortened) task id; ValueError unless exactly one matches"""
+    task = store.get(id_prefix)
+    if task is not None:
+        return task
+    matches = [t for t in store.all() if t["id"].startswith(id_prefix)]
+    if len(matches) != 1:
+        raise ValueError(f"{'No' if not matches else 'More than one'} task matches id '{id_prefix}'")
+    return matches[0]
+
+
+def cmd_add(store, args):
+    task = create_task(args.text, args.priority, args.category, args.due, args.notes, args.repeat)
+    if store.contains_text(task["text"]):
+        print(colored("Warning: a task with the same text already exists", "yellow"))
+    for similar in store.similar_tasks(task["text"]):
+        print(colored(f"Warning: similar task {similar['id'][:8]}: {similar['text']}", "yellow"))
+    store.add(task)
+    store.save()
+    print(colored(f"Added task {task['id'][:8]}: {task['text']}", "green"))
+
+
+def cmd_list(store, args):
+    today = date.today().isoformat()
+    for task in store.query(args.text.lower(), not args.hide_completed, args.sort):
+        print(format_row(task, today))
+
+
+def cmd_complete(store, args):
+    # Complete copies so the stored tasks only change through update
+    tasks = [dict(find_task(store, task_id)) for task_id in args.ids]
+    for task in tasks:
+        if set_completed(task, True):
+            store.update(task)
+            next_due = f" (next due {task['due']})" if task.get("repeat") else ""
+            print(colored(f"Completed: {task['text']}{next_due}", "green"))
+        else:
+            print(colored(f"Already completed: {task['text']}", "yellow"))
+    store.save()
+
+
+def cmd_export(store, args):
+    exporter = TaskExporter(store.export_rows(), store.count()).run(args.file)
+    print(colored(f"Exported {exporter.written} tasks to {args.file}", "green"))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Manage the to-do list without opening the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add a task")
+    add.add_argument("text")
+    add.add_argument("-p", "--priority", choices=PRIORITIES, default="Medium")
+    add.add_argument("-c", "--category", choices=CATEGORIES, default="Other")
+    add.add_argument("-d", "--due", default="", help="due date as YYYY-MM-DD")
+    add.add_argument("-n", "--notes", default="")
+    add.add_argument("-r", "--repeat", default="", help='e.g. daily, weekdays, "every mon,thu", "monthly on the 1st"')
+    add.set_defaults(handler=cmd_add)
+
+    for name, help_text in (("list", "list tasks"), ("query", "search tasks, e.g. 'priority:High due:<2026-11-01 -done report'")):
+        listing = commands.add_parser(name, help=help_text)
+        if name == "query":
+            listing.add_argument("text")
+        else:
+            listing.set_defaults(text="")
+        listing.add_argument("-s", "--sort", choices=sorted(SORT_KEYS) + [RELEVANCE_SORT], default="date")
+        listing.add_argument("--hide-completed", action="store_true")
+        listing.set_defaults(handler=cmd_list)
+
+    complete = commands.add_parser("complete", help="mark tasks as completed")
+    complete.add_argument("ids", nargs="+", help="task ids; a unique prefix is enough")
+    complete.set_defaults(handler=cmd_complete)
+
+    export = commands.add_parser("export", help="export tasks to .json, .jsonl, .csv or .txt")
+    export.add_argument("file")
+    export.set_defaults(handler=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = open_task_store()
+    try:
+        store.load()
+        args.handler(store, args)
+    except Exception as e:
+        print(colored(f"Error: {e}", "red"), file=sys.stderr)
+        return 1
+    finally:
+        # Leave snapshot compaction to the GUI so each command stays quick
+        store.close(compact=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
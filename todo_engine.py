@@ -0,0 +1,3055 @@
+"""Task storage, indexing and import/export, with no GUI dependencies."""
+import os
+import abc
+import bisect
+import calendar
+import csv
+import functools
+import gzip
+import hashlib
+import heapq
+import io
+import itertools
+import json
+import math
+import operator
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+from datetime import datetime, date, timedelta
+import re
+
+# Fallback for colored print if termcolor not installed (for console prints)
+try:
+    from termcolor import colored
+except ImportError:
+    def colored(text, color=None):
+        return text
+
+# Python builds without liblzma simply lose the "lzma" snapshot compression
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+# Advisory locking between processes sharing the data file
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+DATA_FILE = "todo.json"
+DB_FILE = "todo.db"
+# "json" (snapshot + journal) or "sqlite"
+STORAGE_BACKEND = os.environ.get("TODO_STORAGE", "json")
+# Layout of the JSON backend's snapshot: "json" or length-prefixed columnar "frames",
+# optionally compressed with "gzip" or "lzma"; any of them is read back regardless
+SNAPSHOT_FORMAT = os.environ.get("TODO_SNAPSHOT_FORMAT", "json")
+SNAPSHOT_COMPRESSION = os.environ.get("TODO_SNAPSHOT_COMPRESSION", "none")
+SNAPSHOT_BACKUPS = 3  # generations of todo.json.backup kept, rotated by renaming
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+CATEGORIES = ["Personal", "Work", "Shopping", "Health", "Education", "Finance", "Other"]
+PRIORITY_RANK = {p: i for i, p in enumerate(PRIORITIES)}
+JOURNAL_COMPACT_THRESHOLD = 1000  # journal records before folding into the snapshot
+LEGACY_JOURNAL_OPS = ("add", "extend", "update", "delete")  # position-based, pre task IDs
+FOLDED_SEGMENT_SECONDS = 120  # how long other processes can catch up from a compacted journal segment
+UNDO_MEMORY_BUDGET = 32 * 1024 * 1024  # rough bytes of task data the undo history may hold
+UNDO_MAX_ENTRIES = 200
+UNDO_COALESCE_SECONDS = 2.0  # repeated edits of the same tasks within this window undo together
+NEAR_DUPLICATE_THRESHOLD = 0.6  # word-set Jaccard similarity that counts as "similar"
+BM25_K1 = 1.2  # term-frequency saturation
+BM25_B = 0.75  # how strongly long tasks are penalized
+PREFIX_MIN_LENGTH = 3  # shorter unknown search words are not expanded as prefixes
+RELEVANCE_SORT = "relevance"  # BM25 rank of the search words; date order when not searching
+DUPLICATE_STOPWORDS = frozenset(("a", "an", "the", "to", "of", "for", "and", "or", "in", "on", "at", "my", "some"))
+
+NO_DUE_KEY = "9999-99-99"  # date sort key of tasks without a due date, after every real date
+LAST_DUE_KEY = "9999-12-31"
+
+SORT_KEYS = {
+    "priority": lambda t: PRIORITY_RANK.get(t.get("priority", "Medium"), 1),
+    "date": lambda t: t.get("due") or NO_DUE_KEY,
+    "category": lambda t: t.get("category", "Other"),
+    "created": lambda t: t.get("created", ""),
+    "crossed": lambda t: t.get("crossed", False),
+}
+
+
+def new_task_id():
+    """Generate a persistent unique task ID"""
+    return uuid.uuid4().hex
+
+
+SNAPSHOT_HEADER = re.compile(r'\{\s*("seq"\s*:\s*\d+\s*,\s*)?"tasks"\s*:\s*\[')
+SNAPSHOT_SEQ = re.compile(r'\{\s*"seq"\s*:\s*(\d+)')
+FRAMES_MAGIC = b"TODOFRAMES1\n"
+GZIP_MAGIC = b"\x1f\x8b"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+
+def task_content_hash(task):
+    """Hash of the user-visible content, used to spot duplicate tasks"""
+    content = "\x1f".join((task.get("text", "").strip().casefold(), task.get("priority", "Medium"),
+                           task.get("category", "Other"), task.get("due", ""), task.get("notes", "")))
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+def iter_json_records(f, chunk_size=1 << 16):
+    """Yield (record, characters consumed) from a JSON array, JSON Lines or snapshot file.
+
+    Records are decoded one at a time from buffered chunks, so the whole
+    document is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk_size)
+    while len(buf) < 256:
+        # Make sure the format sniffing below sees the whole snapshot header
+        more = f.read(chunk_size)
+        if not more:
+            break
+        buf += more
+    consumed = 0
+    start = len(buf) - len(buf.lstrip())
+    header = SNAPSHOT_HEADER.match(buf, start)
+    if buf[start:start + 1] != "[" and not header:
+        # JSON Lines: one task object per line
+        while True:
+            lines = buf.split("\n")
+            buf = lines.pop()  # possibly incomplete
+            for line in lines:
+                consumed += len(line) + 1
+                if line.strip():
+                    yield json.loads(line), consumed
+            more = f.read(chunk_size)
+            if not more:
+                break
+            buf += more
+        if buf.strip():
+            yield json.loads(buf), consumed + len(buf)
+        return
+
+    pos = header.end() if header else start + 1
+    while True:
+        # Skip separators, topping up the buffer as needed
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            more = f.read(chunk_size)
+            if not more:
+                raise ValueError("Unexpected end of file inside the task array")
+            buf += more
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            more = f.read(chunk_size)
+            if not more:
+                raise
+            buf += more
+            continue
+        yield record, consumed + end
+        pos = end
+        if pos > chunk_size:
+            buf = buf[pos:]
+            consumed += pos
+            pos = 0
+
+
+def normalize_imported_task(record):
+    """Validate one imported record; return a clean task or None if unusable"""
+    if not isinstance(record, dict) or not isinstance(record.get("text"), str) or not record["text"].strip():
+        return None
+    validate_task_structure([record])
+    if record["priority"] not in PRIORITY_RANK:
+        record["priority"] = "Medium"
+    if record["category"] not in CATEGORIES:
+        record["category"] = "Other"
+    record["crossed"] = bool(record["crossed"])
+    if not isinstance(record["notes"], str):
+        record["notes"] = ""
+    try:
+        date.fromisoformat(record["due"])
+    except (TypeError, ValueError):
+        record["due"] = ""
+    try:
+        set_recurrence(record, record.get("repeat") or "")
+    except (AttributeError, TypeError, ValueError):
+        record.pop("repeat", None)
+    return record
+
+
+class TaskImporter:
+    """Streaming importer with content-hash de-duplication.
+
+    Records are parsed, validated and normalized one at a time, and skipped
+    when their content hash matches an existing task or an earlier record in
+    the same file. Runs on the persistence thread; ``progress`` receives the
+    fraction of the file read so far. ``existing_tasks`` is only a snapshot,
+    so ``new_tasks`` checks again against the live store before adding.
+    """
+
+    PROGRESS_EVERY = 5000
+
+    def __init__(self, existing_tasks, progress=None):
+        self.existing_tasks = existing_tasks
+        self.progress = progress
+        self.imported = []
+        self.known_ids = set()
+        self.duplicates = 0
+        self.invalid = 0
+
+    def run(self, file_path):
+        self.known_ids = {task["id"] for task in self.existing_tasks}
+        seen = {task_content_hash(task) for task in self.existing_tasks}
+        size = max(1, os.path.getsize(file_path))
+        with open(file_path, "r", encoding="utf-8") as f:
+            for count, (record, consumed) in enumerate(iter_json_records(f), 1):
+                task = normalize_imported_task(record)
+                if task is None:
+                    self.invalid += 1
+                    continue
+                content_hash = task_content_hash(task)
+                if content_hash in seen:
+                    self.duplicates += 1
+                else:
+                    seen.add(content_hash)
+                    self.imported.append(task)
+                if self.progress is not None and count % self.PROGRESS_EVERY == 0:
+                    self.progress(min(1.0, consumed / size))
+        return self
+
+    def new_tasks(self, current_tasks):
+        """Imported tasks still missing from ``current_tasks``; call right before adding them.
+
+        Only tasks added since ``run`` took its snapshot are hashed: ones the
+        user typed meanwhile, another import that finished first, or tasks
+        merged in from other processes.
+        """
+        added = {task_content_hash(task) for task in current_tasks if task["id"] not in self.known_ids}
+        if added:
+            kept = [task for task in self.imported if task_content_hash(task) not in added]
+            self.duplicates += len(self.imported) - len(kept)
+            self.imported = kept
+        return self.imported
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export job after the user cancels it"""
+
+
+class TaskExporter:
+    """Streaming exporter for JSON, JSON Lines, CSV and text files.
+
+    Tasks are formatted one at a time and written in chunks of CHUNK_ROWS to
+    a temporary file that replaces the target only once the export finishes,
+    so memory stays bounded and a cancelled export leaves nothing behind.
+    Runs on the persistence thread; ``progress`` receives the fraction done.
+    """
+
+    CHUNK_ROWS = 2000
+    FORMATS = (".json", ".jsonl", ".csv", ".txt")
+    CSV_FIELDS = ("text", "crossed", "priority", "category", "due", "notes", "created", "id", "repeat")
+
+    def __init__(self, tasks, total, progress=None):
+        self.tasks = tasks
+        self.total = total
+        self.progress = progress
+        self.cancelled = threading.Event()
+        self.written = 0
+        self.csv_buffer = io.StringIO()
+        self.csv_writer = csv.writer(self.csv_buffer)
+
+    def cancel(self):
+        """Ask the running export to stop at the next chunk; safe from any thread"""
+        self.cancelled.set()
+
+    def run(self, file_path):
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {extension or file_path}")
+        format_row = getattr(self, extension[1:] + "_row")
+        temp_path = file_path + ".part"
+        try:
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(self.header(extension))
+                chunk = []
+                for task in self.tasks:
+                    chunk.append(format_row(task_record(task), self.written + len(chunk)))
+                    if len(chunk) >= self.CHUNK_ROWS:
+                        self.write_chunk(f, chunk)
+                self.write_chunk(f, chunk)
+                f.write(self.footer(extension))
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return self
+
+    def write_chunk(self, f, chunk):
+        if self.cancelled.is_set():
+            raise ExportCancelled()
+        f.write("".join(chunk))
+        self.written += len(chunk)
+        chunk.clear()
+        if self.progress is not None:
+            self.progress(min(1.0, self.written / max(1, self.total)))
+
+    def header(self, extension):
+        if extension == ".json":
+            return "["
+        if extension == ".csv":
+            return self.csv_line(self.CSV_FIELDS)
+        return ""
+
+    def footer(self, extension):
+        if extension == ".json":
+            return "\n]\n" if self.written else "]\n"
+        return ""
+
+    def json_row(self, record, position):
+        return ("\n  " if position == 0 else ",\n  ") + json.dumps(record)
+
+    def jsonl_row(self, record, position):
+        return json.dumps(record) + "\n"
+
+    def csv_row(self, record, position):
+        return self.csv_line([record.get(field, "") for field in self.CSV_FIELDS])
+
+    def txt_row(self, record, position):
+        status = "✅" if record.get("crossed") else "📌"
+        repeat = f" | Repeats: {record['repeat']}" if record.get("repeat") else ""
+        return f"{status} {record['text']} | Priority: {record.get('priority', 'Medium')} | Due: {record.get('due') or 'No date'}{repeat}\n"
+
+    def csv_line(self, values):
+        self.csv_writer.writerow(values)
+        line = self.csv_buffer.getvalue()
+        self.csv_buffer.seek(0)
+        self.csv_buffer.truncate()
+        return line
+
+
+def validate_task_structure(tasks):
+    """Ensure all tasks have required fields"""
+    created = None
+    for task in tasks:
+        # Add missing fields with defaults
+        if not task.get("id"):
+            task["id"] = new_task_id()
+        if "category" not in task:
+            task["category"] = "Other"
+        if "created" not in task:
+            # One timestamp per batch; legacy files can have thousands of these
+            if created is None:
+                created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            task["created"] = created
+        if "priority" not in task:
+            task["priority"] = "Medium"
+        if "due" not in task:
+            task["due"] = ""
+        if "crossed" not in task:
+            task["crossed"] = False
+        if "notes" not in task:
+            task["notes"] = ""
+
+
+def parse_due(due):
+    """Normalize a YYYY-MM-DD due date ("" for none); ValueError if malformed"""
+    due = (due or "").strip()
+    if not due:
+        return ""
+    try:
+        return datetime.strptime(due, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise ValueError("Due date must be in YYYY-MM-DD format.") from None
+
+
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEKDAY_FULL_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTH_NAMES = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+MONTH_FULL_NAMES = ("january", "february", "march", "april", "may", "june", "july",
+                    "august", "september", "october", "november", "december")
+RECURRENCE_UNITS = ("day", "week", "month", "year")
+RECURRENCE_SHORTHANDS = {
+    "daily": "every day",
+    "weekly": "every week",
+    "monthly": "every month",
+    "yearly": "every year",
+    "annually": "every year",
+    "weekdays": "every week on mon,tue,wed,thu,fri",
+    "every weekday": "every week on mon,tue,wed,thu,fri",
+}
+RECURRENCE_PATTERN = re.compile(r"every(?: (\d+))? (day|week|month|year)s?(?: on (.+))?$")
+MONTHDAY_PATTERN = re.compile(r"(?:the )?(\d{1,2})(?:st|nd|rd|th)?$")
+YEARDAY_PATTERNS = (re.compile(r"([a-z]+) (?:the )?(\d{1,2})(?:st|nd|rd|th)?$"),
+                    re.compile(r"(?:the )?(\d{1,2})(?:st|nd|rd|th)? (?:of )?([a-z]+)$"))
+
+
+class RecurrenceRule:
+    """A repeat rule such as "every 2 weeks on mon,thu", "every month on the 1st"
+    or "every year on feb 29".
+
+    A task stores only the rule's text and its next due date; occurrences
+    are generated lazily from that date, so a series is never materialized
+    and callers take just the window they need.
+    """
+
+    def __init__(self, unit, interval=1, weekdays=(), monthday=None, yearday=None):
+        self.unit = unit
+        self.interval = interval
+        self.weekdays = tuple(sorted(set(weekdays)))
+        self.monthday = monthday
+        self.yearday = yearday  # (month, day)
+
+    def describe(self):
+        """Canonical text for the rule, which is what tasks store"""
+        text = f"every {self.unit}" if self.interval == 1 else f"every {self.interval} {self.unit}s"
+        if self.weekdays:
+            text += " on " + ",".join(WEEKDAY_NAMES[d] for d in self.weekdays)
+        if self.monthday:
+            suffix = "th" if 10 < self.monthday % 100 < 14 else {1: "st", 2: "nd", 3: "rd"}.get(self.monthday % 10, "th")
+            text += f" on the {self.monthday}{suffix}"
+        if self.yearday:
+            text += f" on {MONTH_NAMES[self.yearday[0] - 1]} {self.yearday[1]}"
+        return text
+
+    def occurrences(self, anchor, start=None):
+        """Yield occurrence dates from ``anchor`` on, skipping any before ``start``"""
+        start = max(anchor, start or anchor)
+        try:
+            if self.unit == "day":
+                # Jump straight to the first occurrence on or after start
+                steps = -(-(start - anchor).days // self.interval)
+                day = anchor + timedelta(days=steps * self.interval)
+                while True:
+                    yield day
+                    day += timedelta(days=self.interval)
+            elif self.unit == "week":
+                weekdays = self.weekdays or (anchor.weekday(),)
+                first_monday = anchor - timedelta(days=anchor.weekday())
+                weeks = (start - first_monday).days // 7 // self.interval * self.interval
+                while True:
+                    monday = first_monday + timedelta(weeks=weeks)
+                    for weekday in weekdays:
+                        day = monday + timedelta(days=weekday)
+                        if day >= start:
+                            yield day
+                    weeks += self.interval
+            else:
+                step = self.interval * (12 if self.unit == "year" else 1)
+                # Clamping starts from the stored day each time, so feb 29 comes back in leap years
+                month_number, monthday = self.yearday or (anchor.month, self.monthday or anchor.day)
+                month = anchor.year * 12 + month_number - 1
+                month += max(0, (start.year * 12 + start.month - 1 - month) // step) * step
+                while True:
+                    year, month_index = divmod(month, 12)
+                    # Short months clamp: "on the 31st" means the last day there
+                    last = calendar.monthrange(year, month_index + 1)[1]
+                    day = date(year, month_index + 1, min(monthday, last))
+                    if day >= start:
+                        yield day
+                    month += step
+        except (OverflowError, ValueError):
+            return  # ran past date.max
+
+
+def parse_weekdays(text):
+    """Weekday numbers for "mon,thu" or "monday and thursday"; None unless every name is a day"""
+    names = [name for name in re.split(r"[,\s]+|\band\b", text) if name]
+    days = [i for name in names for i, full in enumerate(WEEKDAY_FULL_NAMES)
+            if len(name) >= 3 and full.startswith(name)]
+    return days if names and len(days) == len(names) else None
+
+
+def parse_yearday(text):
+    """(month, day) for "feb 29", "march 14th" or "the 1st of july"; None unless it is a real date"""
+    for pattern in YEARDAY_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            name, day = match.groups() if pattern is YEARDAY_PATTERNS[0] else reversed(match.groups())
+            months = [i for i, full in enumerate(MONTH_FULL_NAMES, 1) if len(name) >= 3 and full.startswith(name)]
+            # Measured against a leap year, so feb 29 is allowed
+            if months and 1 <= int(day) <= calendar.monthrange(2000, months[0])[1]:
+                return months[0], int(day)
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def parse_recurrence(text):
+    """Parse a repeat rule such as "daily", "every monday" or "monthly on the 1st"; ValueError if unknown"""
+    text = " ".join(text.casefold().split())
+    head, sep, tail = text.partition(" on ")
+    text = RECURRENCE_SHORTHANDS.get(head, head) + sep + tail
+    if text.startswith("every ") and " on " not in text and parse_weekdays(text[6:]):
+        # "every monday", "every mon and thu"
+        return RecurrenceRule("week", weekdays=parse_weekdays(text[6:]))
+    match = RECURRENCE_PATTERN.match(text)
+    if match:
+        interval, unit, on = match.groups()
+        interval = int(interval or 1)
+        if interval < 1:
+            raise ValueError("A repeat interval must be at least 1")
+        if not on:
+            return RecurrenceRule(unit, interval)
+        weekdays = parse_weekdays(on) if unit == "week" else None
+        if weekdays:
+            return RecurrenceRule(unit, interval, weekdays=weekdays)
+        monthday = MONTHDAY_PATTERN.match(on) if unit == "month" else None
+        if monthday and 1 <= int(monthday.group(1)) <= 31:
+            return RecurrenceRule(unit, interval, monthday=int(monthday.group(1)))
+        yearday = parse_yearday(on) if unit == "year" else None
+        if yearday:
+            return RecurrenceRule(unit, interval, yearday=yearday)
+    raise ValueError(f"Unknown repeat rule '{text}'; try daily, weekdays, every monday, "
+                     "every 2 weeks, monthly on the 1st or yearly on mar 14")
+
+
+def task_recurrence(task):
+    """The task's RecurrenceRule, or None for a one-off task"""
+    repeat = task.get("repeat")
+    return parse_recurrence(repeat) if repeat else None
+
+
+def set_recurrence(task, text):
+    """Set (or with empty text clear) a task's repeat rule; ValueError if not understood.
+
+    The due date moves to the first occurrence on or after it (or today).
+    An implied day is written into the rule, so "monthly" from the 31st
+    stays on month ends instead of drifting to the 28th after February,
+    and "yearly" from Feb 29 returns to the 29th in leap years.
+    """
+    if not text.strip():
+        task.pop("repeat", None)
+        return
+    rule = parse_recurrence(text)
+    anchor = date.fromisoformat(task["due"]) if task.get("due") else date.today()
+    if rule.unit == "week" and not rule.weekdays:
+        rule = RecurrenceRule("week", rule.interval, weekdays=(anchor.weekday(),))
+    elif rule.unit == "month" and not rule.monthday:
+        rule = RecurrenceRule("month", rule.interval, monthday=anchor.day)
+    elif rule.unit == "year" and not rule.yearday:
+        rule = RecurrenceRule("year", rule.interval, yearday=(anchor.month, anchor.day))
+    task["repeat"] = rule.describe()
+    task["due"] = next(rule.occurrences(anchor)).isoformat()
+
+
+def upcoming_occurrences(task, count):
+    """The next ``count`` due dates of a repeating task, starting with the current one"""
+    rule = task_recurrence(task)
+    if rule is None or not task.get("due"):
+        return []
+    return [day.isoformat() for day in itertools.islice(rule.occurrences(date.fromisoformat(task["due"])), count)]
+
+
+def missed_occurrences(task, today, limit):
+    """How many occurrences after the current due date have already passed, up to ``limit``"""
+    rule = task_recurrence(task)
+    if rule is None or task.get("crossed", False) or not task.get("due") or task["due"] >= today.isoformat():
+        return 0
+    due = date.fromisoformat(task["due"])
+    passed = itertools.takewhile(lambda day: day < today, rule.occurrences(due, due + timedelta(days=1)))
+    return sum(1 for _ in itertools.islice(passed, limit))
+
+
+def create_task(text, priority="Medium", category="Other", due="", notes="", repeat=""):
+    """Build a new task from user input; ValueError if a field is invalid"""
+    text = text.strip()
+    if not text:
+        raise ValueError("Task cannot be empty.")
+    if priority not in PRIORITY_RANK:
+        raise ValueError(f"Priority must be one of: {', '.join(PRIORITIES)}")
+    if category not in CATEGORIES:
+        raise ValueError(f"Category must be one of: {', '.join(CATEGORIES)}")
+    task = {
+        "text": text,
+        "crossed": False,
+        "priority": priority,
+        "category": category,
+        "due": parse_due(due),
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "notes": notes
+    }
+    set_recurrence(task, repeat)
+    return task
+
+
+def set_completed(task, completed):
+    """Mark a task done or open again; False if it already was.
+
+    Completing a repeating task instead moves it to its next occurrence
+    that is not already past, so it never needs a copy per occurrence.
+    """
+    rule = task_recurrence(task)
+    if completed and rule is not None and not task.get("crossed", False):
+        today = date.today()
+        due = date.fromisoformat(task["due"]) if task.get("due") else today
+        next_due = next(rule.occurrences(due, max(due + timedelta(days=1), today)), None)
+        if next_due is not None:
+            task["due"] = next_due.isoformat()
+            task["last_completed"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            return True
+    if task.get("crossed", False) == completed:
+        return False
+    task["crossed"] = completed
+    if completed:
+        task["completed_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    else:
+        task.pop("completed_date", None)
+    return True
+
+
+def task_record(task):
+    """Return the persisted form of a task, without store bookkeeping keys"""
+    return {k: v for k, v in task.items() if not k.startswith("_")}
+
+
+def search_document(task):
+    """Lowercased searchable fields; the separator stops matches spanning two fields"""
+    return "\x1f".join((task["text"], task.get("notes", ""),
+                         task.get("category", ""), task.get("priority", ""))).lower()
+
+
+class TrigramIndex:
+    """Inverted trigram index for substring search over task text and notes.
+
+    A query of three or more characters intersects the posting sets of its
+    trigrams, smallest first, and verifies the few survivors. When a query
+    extends the previous one, the previous matches are narrowed instead.
+    ``narrow`` does the same starting from a given candidate set, so the
+    terms of a multi-word search can be applied one after another.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.docs = {}
+        self.last_query = None
+        self.last_ids = None
+
+    @staticmethod
+    def trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, task):
+        doc = search_document(task)
+        old_doc = self.docs.get(task["id"])
+        if old_doc == doc:
+            return
+        if old_doc is not None:
+            self.discard(task["id"])
+        self.docs[task["id"]] = doc
+        for gram in self.trigrams(doc):
+            self.postings.setdefault(gram, set()).add(task["id"])
+        self.last_query = None
+
+    def discard(self, task_id):
+        doc = self.docs.pop(task_id, None)
+        if doc is None:
+            return
+        for gram in self.trigrams(doc):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del self.postings[gram]
+        self.last_query = None
+
+    def clear(self):
+        self.postings = {}
+        self.docs = {}
+        self.last_query = None
+
+    def estimate(self, query):
+        """Upper bound on how many tasks ``search(query)`` returns, without searching"""
+        if self.last_query is not None and self.last_query in query:
+            return len(self.last_ids)
+        if len(query) < 3:
+            return len(self.docs)
+        return min(len(self.postings.get(gram, ())) for gram in self.trigrams(query))
+
+    def search(self, query):
+        """Return the set of task IDs whose searchable fields contain query"""
+        docs = self.docs
+        if self.last_query is not None and self.last_query in query:
+            # Typing extends the query: only previous matches can still match
+            ids = {i for i in self.last_ids if query in docs[i]}
+        elif len(query) < 3:
+            ids = {i for i, doc in docs.items() if query in doc}
+        else:
+            postings = sorted((self.postings.get(gram, set()) for gram in self.trigrams(query)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= posting
+            ids = {i for i in candidates if query in docs[i]}
+        self.last_query = query
+        self.last_ids = ids
+        return ids
+
+    def narrow(self, ids, query):
+        """The IDs among ``ids`` whose searchable fields contain query"""
+        if len(query) >= 3:
+            # Set intersection walks the smaller side, so a small ``ids`` stays cheap
+            for posting in sorted((self.postings.get(gram, set()) for gram in self.trigrams(query)), key=len):
+                ids = ids & posting
+                if not ids:
+                    return set()
+        docs = self.docs
+        return {i for i in ids if query in docs[i]}
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def stem(word):
+    """Light suffix stripping so "meets", "meeting" and "meetings" share a term"""
+    if len(word) > 4 and word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif len(word) > 3 and word.endswith(("ches", "shes", "sses", "xes", "zes")):
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ed"):
+        return word[:-2]
+    return word
+
+
+def tokenize(text):
+    return [stem(word) for word in re.findall(r"\w+", text.casefold())]
+
+
+class FullTextIndex:
+    """Term postings over task text and notes, for BM25 ranking.
+
+    Each posting maps a stemmed term to {task id: term frequency}; task
+    lengths are kept alongside, and each task's distinct terms for removal.
+    Scoring reads only the postings of the query's own terms. A sorted
+    vocabulary, built on the first prefix lookup, turns prefix expansion
+    into two bisections.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.lengths = {}
+        self.doc_terms = {}
+        self.total_length = 0
+        self.vocabulary = None
+
+    def add(self, task):
+        task_id = task["id"]
+        self.discard(task_id)
+        terms = tokenize(task["text"] + " " + task.get("notes", ""))
+        for term in terms:
+            counts = self.postings.get(term)
+            if counts is None:
+                counts = self.postings[term] = {}
+                if self.vocabulary is not None:
+                    bisect.insort(self.vocabulary, term)
+            counts[task_id] = counts.get(task_id, 0) + 1
+        self.lengths[task_id] = len(terms)
+        self.doc_terms[task_id] = tuple(set(terms))
+        self.total_length += len(terms)
+
+    def discard(self, task_id):
+        terms = self.doc_terms.pop(task_id, None)
+        if terms is None:
+            return
+        self.total_length -= self.lengths.pop(task_id)
+        for term in terms:
+            counts = self.postings[term]
+            del counts[task_id]
+            if not counts:
+                del self.postings[term]
+                if self.vocabulary is not None:
+                    del self.vocabulary[bisect.bisect_left(self.vocabulary, term)]
+
+    def clear(self):
+        self.postings = {}
+        self.lengths = {}
+        self.doc_terms = {}
+        self.total_length = 0
+        self.vocabulary = None
+
+    def query_terms(self, text):
+        """Stemmed query terms; an unknown one of PREFIX_MIN_LENGTH or more is taken as a prefix"""
+        terms = set()
+        for term in tokenize(text):
+            if term in self.postings:
+                terms.add(term)
+            elif len(term) >= PREFIX_MIN_LENGTH:
+                # Probably a word still being typed
+                if self.vocabulary is None:
+                    self.vocabulary = sorted(self.postings)
+                start = bisect.bisect_left(self.vocabulary, term)
+                end = bisect.bisect_left(self.vocabulary, term + "\U0010ffff", start)
+                terms.update(self.vocabulary[start:end])
+        return terms
+
+    def scores(self, text, task_ids):
+        """Map each of ``task_ids`` to its BM25 score for ``text``; 0.0 without a match"""
+        scores = dict.fromkeys(task_ids, 0.0)
+        if not self.lengths:
+            return scores
+        count = len(self.lengths)
+        lengths = self.lengths
+        # tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average length))
+        base = BM25_K1 * (1 - BM25_B)
+        slope = BM25_K1 * BM25_B * count / max(1, self.total_length)
+        for term in self.query_terms(text):
+            counts = self.postings[term]
+            weight = math.log(1 + (count - len(counts) + 0.5) / (len(counts) + 0.5)) * (BM25_K1 + 1)
+            if len(scores) < len(counts):
+                pairs = [(i, counts[i]) for i in scores if i in counts]
+            else:
+                pairs = [(i, tf) for i, tf in counts.items() if i in scores]
+            for task_id, tf in pairs:
+                scores[task_id] += weight * tf / (tf + base + slope * lengths[task_id])
+        return scores
+
+
+def normalize_text(text):
+    """Casefolded task text with runs of whitespace collapsed"""
+    return " ".join(text.casefold().split())
+
+
+class DuplicateIndex:
+    """Exact and near-duplicate lookup for task text.
+
+    Exact duplicates are a dict lookup on the normalized text. Near
+    duplicates come from an inverted index of words (minus stopwords): a
+    task at least NEAR_DUPLICATE_THRESHOLD similar must share one of the
+    query's rarest few words, so only those posting lists are scanned and
+    their tasks confirmed with the real Jaccard similarity.
+    """
+
+    def __init__(self):
+        self.exact = {}
+        self.entries = {}
+        self.postings = {}
+
+    @staticmethod
+    def words(normalized):
+        words = set(re.findall(r"\w+", normalized))
+        return frozenset(words - DUPLICATE_STOPWORDS or words or {normalized})
+
+    def add(self, task_id, text):
+        normalized = normalize_text(text)
+        entry = self.entries.get(task_id)
+        if entry is not None:
+            if entry[0] == normalized:
+                return
+            self.discard(task_id)
+        words = self.words(normalized)
+        self.entries[task_id] = (normalized, words)
+        self.exact.setdefault(normalized, set()).add(task_id)
+        for word in words:
+            self.postings.setdefault(word, set()).add(task_id)
+
+    def discard(self, task_id):
+        entry = self.entries.pop(task_id, None)
+        if entry is None:
+            return
+        normalized, words = entry
+        for table, key in [(self.exact, normalized)] + [(self.postings, w) for w in words]:
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del table[key]
+
+    def has_exact(self, text):
+        return normalize_text(text) in self.exact
+
+    def similar(self, text, limit=3):
+        """IDs of tasks whose text is similar but not identical, most similar first"""
+        normalized = normalize_text(text)
+        words = self.words(normalized)
+        # Jaccard >= t needs at least ceil(t * |words|) shared words, so any
+        # match contains one of the rarest len(words) - that + 1 words
+        prefix = len(words) - math.ceil(NEAR_DUPLICATE_THRESHOLD * len(words)) + 1
+        rarest = sorted((self.postings.get(w, ()) for w in words), key=len)[:prefix]
+        candidates = set().union(*rarest)
+        scored = []
+        for task_id in candidates:
+            other, other_words = self.entries[task_id]
+            if other == normalized:
+                continue
+            score = len(words & other_words) / len(words | other_words)
+            if score >= NEAR_DUPLICATE_THRESHOLD:
+                scored.append((score, task_id))
+        scored.sort(key=lambda pair: -pair[0])
+        return [task_id for _, task_id in scored[:limit]]
+
+
+class SortIndex:
+    """Tasks kept ordered by one sort mode, maintained with bisect.
+
+    Entries are ``(key, order, id)`` tuples, where ``order`` is the task's
+    insertion ordinal, so walking the index reproduces a stable sort of the
+    store without sorting on every refresh.
+    """
+
+    # Above this many inserts at once a re-sort beats repeated insort
+    BULK_THRESHOLD = 64
+
+    def __init__(self, key_func):
+        self.key_func = key_func
+        self.entries = []
+        self.entry_of = {}
+
+    def rebuild(self, tasks, orders):
+        self.entry_of = {t["id"]: (self.key_func(t), orders[t["id"]], t["id"]) for t in tasks}
+        self.entries = sorted(self.entry_of.values())
+
+    def add(self, task, order):
+        entry = (self.key_func(task), order, task["id"])
+        if self.entry_of.get(task["id"]) == entry:
+            return
+        self.discard(task["id"])
+        bisect.insort(self.entries, entry)
+        self.entry_of[task["id"]] = entry
+
+    def add_many(self, tasks, orders):
+        if len(tasks) < self.BULK_THRESHOLD:
+            for task in tasks:
+                self.add(task, orders[task["id"]])
+            return
+        for task in tasks:
+            self.discard(task["id"])
+            entry = (self.key_func(task), orders[task["id"]], task["id"])
+            self.entry_of[task["id"]] = entry
+            self.entries.append(entry)
+        self.entries.sort()
+
+    def discard(self, task_id):
+        entry = self.entry_of.pop(task_id, None)
+        if entry is not None:
+            del self.entries[bisect.bisect_left(self.entries, entry)]
+
+    def discard_many(self, task_ids):
+        if len(task_ids) < self.BULK_THRESHOLD:
+            for task_id in task_ids:
+                self.discard(task_id)
+            return
+        doomed = set(task_ids)
+        for task_id in doomed:
+            self.entry_of.pop(task_id, None)
+        self.entries = [entry for entry in self.entries if entry[2] not in doomed]
+
+    def clear(self):
+        self.entries = []
+        self.entry_of = {}
+
+    def span(self, low, high):
+        """Slice bounds of the entries whose key lies in [low, high]; None is unbounded"""
+        start = 0 if low is None else bisect.bisect_left(self.entries, (low,))
+        end = len(self.entries) if high is None else bisect.bisect_left(self.entries, (high, math.inf))
+        return start, max(start, end)
+
+    def ids_between(self, start, end):
+        return {entry[2] for entry in self.entries[start:end]}
+
+    def __iter__(self):
+        return map(operator.itemgetter(2), self.entries)
+
+
+QUERY_TOKEN = re.compile(r'(-?)(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+QUERY_COMPARISON = re.compile(r"(<=|>=|<|>|=)?(.*)")
+
+
+class QueryFilter:
+    """A ``field:value`` term as an inclusive key range over one sort mode.
+
+    ``low`` and ``high`` are SORT_KEYS[mode] values (None is unbounded), so
+    the range can be read straight off that mode's SortIndex or its column.
+    """
+
+    def __init__(self, mode, low, high, negated=False):
+        self.mode = mode
+        self.low = low
+        self.high = high
+        self.negated = negated
+
+    def matches(self, task):
+        key = SORT_KEYS[self.mode](task)
+        inside = (self.low is None or key >= self.low) and (self.high is None or key <= self.high)
+        return inside != self.negated
+
+
+class TaskQuery:
+    """A parsed search: field filters plus lowercased text terms, all ANDed.
+
+    Syntax: ``priority:High`` (also ``<``, ``<=``, ``>``, ``>=``),
+    ``category:Work``, ``due:<2026-11-01`` (a date, ``today`` or ``none``),
+    ``done`` / ``is:done`` / ``is:open``, ``"exact phrase"`` and plain
+    words. A leading ``-`` negates any term. Values may be abbreviated.
+    """
+
+    def __init__(self, filters=(), terms=()):
+        self.filters = list(filters)
+        self.terms = list(terms)
+
+    def ranked_text(self):
+        """The words and phrases to rank by relevance; negated terms do not count"""
+        return " ".join(term for term, negated in self.terms if not negated)
+
+    def require(self, mode, low, high):
+        self.filters.append(QueryFilter(mode, low, high))
+        return self
+
+    def matches(self, task, doc=None):
+        """Whether a task passes every term; ``doc`` is its search_document if known"""
+        for term in self.filters:
+            if not term.matches(task):
+                return False
+        if not self.terms:
+            return True
+        doc = doc or search_document(task)
+        return all((term in doc) != negated for term, negated in self.terms)
+
+
+def parse_query(text, today=None):
+    """Compile search box text into a TaskQuery; ValueError for a bad filter value"""
+    query = TaskQuery()
+    for match in QUERY_TOKEN.finditer(text):
+        sign, field, phrase, word = match.groups()
+        negated = sign == "-"
+        value = phrase if phrase is not None else word
+        if field is None and phrase is None and value.endswith(":"):
+            field, value = value[:-1], ""
+        field = field.lower() if field else None
+        if field is None and phrase is None and value.lower() == "done":
+            field, value = "is", "done"
+        parse = QUERY_FIELDS.get(field)
+        if parse is not None and not value.strip():
+            continue  # "priority:" while the value is still being typed
+        if parse is None:
+            # Not a filter (or an unknown prefix such as a URL scheme): search for it
+            term = phrase if field is None and phrase is not None else match.group(0)[len(sign):].replace('"', "")
+            if term:
+                query.terms.append((term.lower(), negated))
+            continue
+        mode, low, high = parse(value, today or date.today())
+        query.filters.append(QueryFilter(mode, low, high, negated))
+    return query
+
+
+def split_comparison(value):
+    op, value = QUERY_COMPARISON.match(value.strip()).groups()
+    return op or "=", value.strip()
+
+
+def match_choice(value, choices, field):
+    """The choice ``value`` names, case-insensitively and possibly abbreviated"""
+    found = [c for c in choices if c.lower().startswith(value.lower())] if value else []
+    exact = [c for c in found if c.lower() == value.lower()]
+    if len(exact or found) != 1:
+        raise ValueError(f"Unknown {field} '{value}'; use one of {', '.join(choices)}")
+    return (exact or found)[0]
+
+
+def comparison_range(op, key, before, after, low=None, high=None):
+    """Inclusive [low, high] for ``op key`` given the neighbouring keys"""
+    return {"=": (key, key), "<": (low, before), "<=": (low, key),
+            ">": (after, high), ">=": (key, high)}[op]
+
+
+def parse_priority_filter(value, today):
+    op, value = split_comparison(value)
+    rank = PRIORITY_RANK[match_choice(value, PRIORITIES, "priority")]
+    return ("priority",) + comparison_range(op, rank, rank - 1, rank + 1)
+
+
+def parse_category_filter(value, today):
+    op, value = split_comparison(value)
+    if op != "=":
+        raise ValueError("Categories can only be matched exactly, e.g. category:Work")
+    category = match_choice(value, CATEGORIES, "category")
+    return "category", category, category
+
+
+def parse_due_filter(value, today):
+    op, value = split_comparison(value)
+    if value.lower() == "none" and op == "=":
+        return "date", NO_DUE_KEY, NO_DUE_KEY
+    try:
+        day = today if value.lower() == "today" else date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid due date '{value}'; use YYYY-MM-DD, today or none") from None
+    # Tasks without a due date sort after LAST_DUE_KEY, so open ranges stop there
+    before = (day - timedelta(days=1)).isoformat() if day > date.min else ""
+    after = (day + timedelta(days=1)).isoformat() if day < date.max else NO_DUE_KEY
+    return ("date",) + comparison_range(op, day.isoformat(), before, after, high=LAST_DUE_KEY)
+
+
+def parse_state_filter(value, today):
+    state = match_choice(value, ("done", "open"), "state")
+    return "crossed", state == "done", state == "done"
+
+
+QUERY_FIELDS = {
+    "priority": parse_priority_filter,
+    "category": parse_category_filter,
+    "due": parse_due_filter,
+    "is": parse_state_filter,
+}
+
+
+def index_tasks(tasks):
+    """Build an insertion-ordered id -> task map, assigning missing IDs"""
+    by_id = {}
+    for task in tasks:
+        if not task.get("id") or task["id"] in by_id:
+            task["id"] = new_task_id()
+        by_id[task["id"]] = task
+    return by_id
+
+
+def apply_journal_record(tasks, record):
+    """Replay a single journal record onto an id -> task map"""
+    op = record.get("op")
+    if op == "put":
+        for task in record["tasks"]:
+            tasks[task["id"]] = task
+        if record.get("before"):
+            move_tasks_before(tasks, record["before"])
+    elif op == "remove":
+        for task_id in record["ids"]:
+            tasks.pop(task_id, None)
+    elif op == "clear":
+        tasks.clear()
+    # Records written before tasks had IDs address them by position
+    elif op in ("add", "extend"):
+        for task in record.get("tasks") or [record["task"]]:
+            if not task.get("id"):
+                task["id"] = new_task_id()
+            tasks[task["id"]] = task
+    elif op == "update":
+        task_id = list(tasks)[record["index"]]
+        record["task"]["id"] = task_id
+        tasks[task_id] = record["task"]
+    elif op == "delete":
+        task_ids = list(tasks)
+        for i in record["indices"]:
+            tasks.pop(task_ids[i], None)
+
+
+def move_tasks_before(tasks, before):
+    """Reorder an id -> task map so each ID in ``before`` sits just ahead of the ID it maps to.
+
+    Tasks whose anchor is gone stay at the end, where ``put`` left them.
+    """
+    waiting = {}
+    for task_id, anchor in before.items():
+        if task_id in tasks and anchor in tasks and anchor not in before:
+            waiting.setdefault(anchor, []).append(task_id)
+    if not waiting:
+        return
+    moved = {task_id: tasks.pop(task_id) for task_ids in waiting.values() for task_id in task_ids}
+    keys = list(tasks)
+    marks = [i for i, task_id in enumerate(keys) if task_id in waiting]
+    # Only tasks from the first anchor on have to be re-inserted
+    tail = []
+    for start, end in zip(marks, marks[1:] + [len(keys)]):
+        tail += waiting[keys[start]]
+        tail += keys[start:end]
+    tasks.update(moved)
+    values = list(map(tasks.pop, tail))
+    tasks.update(zip(tail, values))
+
+
+def file_key(path):
+    """(device, inode, size, mtime) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def set_aside(path, target=None):
+    """Rename ``path`` to ``target`` or the first free ``<path>.corrupt[.n]``; return the new name"""
+    if target is None:
+        target = f"{path}.corrupt"
+        n = 1
+        while os.path.exists(target):
+            target = f"{path}.corrupt.{n}"
+            n += 1
+    os.replace(path, target)
+    return target
+
+
+def first_line(path):
+    """The first complete line of a file; identifies a journal file across renames"""
+    try:
+        with open(path, "rb") as f:
+            line = f.readline()
+    except FileNotFoundError:
+        return None
+    return line if line.endswith(b"\n") else None
+
+
+class FileLock:
+    """Advisory lock on a side file, shared by every process using the data file.
+
+    Uses flock on POSIX and msvcrt.locking on Windows; where neither is
+    available it only serializes threads. Re-entrant within a process, so
+    a flush may compact and a compaction may flush while holding it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._handle = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                if self._handle is None:
+                    self._handle = open(self.path, "a+b")
+                if fcntl is not None:
+                    fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX)
+                elif msvcrt is not None:
+                    self._handle.seek(0)
+                    msvcrt.locking(self._handle.fileno(), msvcrt.LK_LOCK, 1)
+            except Exception:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                if fcntl is not None:
+                    fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    self._handle.seek(0)
+                    msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._thread_lock.release()
+
+    def close(self):
+        with self._thread_lock:
+            if self._handle is not None and self._depth == 0:
+                self._handle.close()
+                self._handle = None
+
+
+class SnapshotSerializer:
+    """Writes task snapshots in the configured layout and reads any of them back.
+
+    "json" is the plain ``{"seq": n, "tasks": [...]}`` document. "frames"
+    is a magic line and a JSON header followed by length-prefixed frames of
+    up to FRAME_ROWS tasks stored column by column, so each field name is
+    written once per frame rather than once per task, and a truncated file
+    is detected instead of half-loaded. Either can be gzip or lzma
+    compressed; reading sniffs magic bytes, so changing the settings takes
+    effect at the next snapshot with no conversion step.
+    """
+
+    FRAME_ROWS = 5000
+    FORMATS = ("json", "frames")
+    COMPRESSIONS = ("none", "gzip", "lzma")
+
+    def __init__(self, layout=SNAPSHOT_FORMAT, compression=SNAPSHOT_COMPRESSION):
+        if layout not in self.FORMATS:
+            raise ValueError(f"Unsupported snapshot format: {layout}")
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unsupported snapshot compression: {compression}")
+        if compression == "lzma" and lzma is None:
+            raise ValueError("lzma compression is not available in this Python build")
+        self.layout = layout
+        self.compression = compression
+
+    # ---- Writing ----
+
+    def write(self, f, tasks, seq):
+        """Serialize to a binary file object, which the caller fsyncs and closes"""
+        write_layout = getattr(self, f"write_{self.layout}")
+        if self.compression == "none":
+            write_layout(f, tasks, seq)
+            return
+        if self.compression == "gzip":
+            stream = gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6, mtime=0)
+        else:
+            stream = lzma.LZMAFile(f, "wb", preset=1)
+        with stream:
+            write_layout(stream, tasks, seq)
+
+    def write_json(self, f, tasks, seq):
+        # One json.dumps per chunk is far faster than json.dump's streaming encoder
+        f.write(f'{{"seq":{seq},"tasks":['.encode("utf-8"))
+        for start in range(0, len(tasks), self.FRAME_ROWS):
+            chunk = json.dumps(tasks[start:start + self.FRAME_ROWS], separators=(",", ":"))[1:-1]
+            f.write(("," if start else "").encode("utf-8") + chunk.encode("utf-8"))
+        f.write(b"]}")
+
+    def write_frames(self, f, tasks, seq):
+        f.write(FRAMES_MAGIC)
+        f.write(json.dumps({"seq": seq, "tasks": len(tasks)}, separators=(",", ":")).encode("utf-8") + b"\n")
+        for start in range(0, len(tasks), self.FRAME_ROWS):
+            payload = json.dumps(self.encode_frame(tasks[start:start + self.FRAME_ROWS]),
+                                 separators=(",", ":")).encode("utf-8")
+            f.write(struct.pack(">I", len(payload)))
+            f.write(payload)
+
+    @staticmethod
+    def encode_frame(tasks):
+        """Dense columns for fields every task has, (rows, values) pairs for the rest"""
+        counts = {}
+        for task in tasks:
+            for field in task:
+                counts[field] = counts.get(field, 0) + 1
+        dense = [field for field, count in counts.items() if count == len(tasks)]
+        sparse = {}
+        for field, count in counts.items():
+            if count < len(tasks):
+                rows = [i for i, task in enumerate(tasks) if field in task]
+                sparse[field] = [rows, [tasks[i][field] for i in rows]]
+        return {"rows": len(tasks), "fields": dense,
+                "columns": [[task[field] for task in tasks] for field in dense], "sparse": sparse}
+
+    # ---- Reading ----
+
+    @staticmethod
+    def open_stream(path):
+        """Open a snapshot as a binary stream, undoing any compression"""
+        with open(path, "rb") as f:
+            magic = f.read(len(XZ_MAGIC))
+        if magic.startswith(GZIP_MAGIC):
+            return gzip.open(path, "rb")
+        if magic.startswith(XZ_MAGIC):
+            if lzma is None:
+                raise ValueError(f"{path} is lzma-compressed, but this Python build has no lzma module")
+            return lzma.open(path, "rb")
+        return open(path, "rb")
+
+    def read(self, path):
+        """Return (tasks, seq) from a snapshot in any supported layout"""
+        with self.open_stream(path) as f:
+            magic = f.read(len(FRAMES_MAGIC))
+            if magic == FRAMES_MAGIC:
+                return self.read_frames(f)
+            data = json.loads(magic + f.read())
+        # Legacy files are a bare list of tasks
+        if isinstance(data, list):
+            return data, 0
+        return data.get("tasks", []), data.get("seq", 0)
+
+    def read_frames(self, f):
+        header = json.loads(f.readline())
+        tasks = []
+        while len(tasks) < header["tasks"]:
+            size = f.read(4)
+            length = struct.unpack(">I", size)[0] if len(size) == 4 else None
+            payload = f.read(length) if length else b""
+            if not payload or len(payload) != length:
+                raise ValueError("Snapshot is truncated")
+            tasks += self.decode_frame(json.loads(payload))
+        return tasks, header["seq"]
+
+    @staticmethod
+    def decode_frame(frame):
+        if frame["fields"]:
+            tasks = [dict(zip(frame["fields"], values)) for values in zip(*frame["columns"])]
+        else:
+            tasks = [{} for _ in range(frame["rows"])]
+        for field, (rows, values) in frame["sparse"].items():
+            for i, value in zip(rows, values):
+                tasks[i][field] = value
+        return tasks
+
+    def header(self, path, size=256):
+        """The start of the snapshot's JSON text, where its seq is"""
+        with self.open_stream(path) as f:
+            head = f.read(size)
+        if head.startswith(FRAMES_MAGIC):
+            head = head[len(FRAMES_MAGIC):]
+        return head.decode("utf-8", "ignore")
+
+
+class TaskJournal:
+    """Append-only write-ahead journal on top of a compacted JSON snapshot.
+
+    Each change is serialized as one JSON line by ``append`` and written to
+    ``<data file>.journal`` by ``flush``, which fsyncs a whole burst of
+    changes at once, so a click costs a few hundred bytes of I/O instead of
+    a full rewrite. Once enough records pile up the journal is sealed and
+    folded into the snapshot on a background thread; startup replays
+    snapshot plus journal, skipping records the snapshot already contains.
+
+    Several processes may share the files. Every read-modify-write runs
+    under a FileLock, and ``seq`` is a generation counter shared through
+    the files: before writing, a flush reads the records others appended
+    since it last looked and numbers its own after them. Those records
+    queue up in ``incoming`` for the store to merge, so a running instance
+    follows the journal tail instead of reloading the whole file.
+
+    ``append`` may be called from the UI thread while ``flush``, ``poll``
+    and ``compact`` run on a single persistence thread.
+    """
+
+    def __init__(self, data_file=DATA_FILE, compact_threshold=JOURNAL_COMPACT_THRESHOLD,
+                 serializer=None, backups=SNAPSHOT_BACKUPS):
+        self.data_file = data_file
+        self.journal_file = f"{data_file}.journal"
+        self.backup_file = f"{data_file}.backup"
+        self.serializer = serializer or SnapshotSerializer()
+        self.backups = backups
+        self.lock = FileLock(f"{data_file}.lock")
+        self.compact_threshold = compact_threshold
+        self.seq = 0
+        self.pending = 0
+        self.replayed_legacy = False
+        # What the files looked like when we last caught up with them
+        self.journal_key = None
+        self.journal_head = None
+        self.snapshot_key = None
+        self.last_snapshot_seq = 0
+        self.offset = 0
+        self._handle = None
+        self._compactor = None
+        self._compact_lock = threading.Lock()
+        # Guarded by _buffer_lock: staged and in-flight records with the task
+        # IDs they touch, our written seq per ID (None for a clear), and
+        # records from other processes waiting to be merged
+        self._buffer = []
+        self._in_flight = []
+        self._written = {}
+        self.incoming = []
+        self._buffer_lock = threading.Lock()
+
+    # ---- Reading ----
+
+    def backup_files(self):
+        """Backup generations, newest first"""
+        return [self.backup_file] + [f"{self.backup_file}.{i}" for i in range(1, self.backups)]
+
+    def read_snapshot(self):
+        """Return (tasks, seq, path) from the snapshot, falling back to the newest readable backup"""
+        error = None
+        for path in [self.data_file] + self.backup_files():
+            if not os.path.exists(path):
+                continue
+            try:
+                return self.serializer.read(path) + (path,)
+            except Exception as e:
+                print(colored(f"Could not read {path}: {e}", "yellow"))
+                error = error or e
+        if error is not None:
+            raise error
+        return [], 0, self.data_file
+
+    def snapshot_seq(self):
+        """The snapshot's seq from its header; infinite for files we cannot place"""
+        try:
+            match = SNAPSHOT_SEQ.match(self.serializer.header(self.data_file))
+        except FileNotFoundError:
+            return 0
+        except Exception:
+            return math.inf
+        return int(match.group(1)) if match else math.inf
+
+    def sealed_segments(self, folded=False):
+        """Sealed journal segments awaiting compaction, oldest first, as (last seq, path).
+
+        With ``folded``, segments already in the snapshot are included too;
+        they are kept for a while so other processes can catch up from them.
+        """
+        folder = os.path.dirname(self.journal_file) or "."
+        prefix = os.path.basename(self.journal_file) + "."
+        segments = []
+        for name in os.listdir(folder):
+            if not name.startswith(prefix):
+                continue
+            seq, _, suffix = name[len(prefix):].partition(".")
+            if seq.isdigit() and (not suffix or folded and suffix == "folded"):
+                segments.append((int(seq), os.path.join(folder, name)))
+        return sorted(segments)
+
+    def remove_expired_segments(self):
+        """Delete folded segments older than FOLDED_SEGMENT_SECONDS; call holding the lock"""
+        expired = time.time() - FOLDED_SEGMENT_SECONDS
+        for _, path in self.sealed_segments(folded=True):
+            if path.endswith(".folded") and os.path.getmtime(path) < expired:
+                os.remove(path)
+
+    def read_records(self, path, repair=False):
+        """Yield journal records from a file, stopping at a torn trailing write"""
+        if not os.path.exists(path):
+            return
+        valid_bytes = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(colored(f"Ignoring incomplete journal record in {path}", "yellow"))
+                    break
+                valid_bytes += len(line)
+                yield record
+        # Cut the torn tail so later appends start on a clean line
+        if repair and valid_bytes < os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def replay_paths(self, snapshot_seq, source):
+        """Sealed segments to replay over a snapshot read from ``source``.
+
+        Folded segments are only wanted when an older backup had to stand in
+        for the snapshot; they hold the changes it is missing.
+        """
+        folded = source != self.data_file
+        return [path for last_seq, path in self.sealed_segments(folded) if last_seq > snapshot_seq]
+
+    def read_from(self, path, offset):
+        """Return (complete records after ``offset``, offset just past them)"""
+        records = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                offset += len(line)
+        return records, offset
+
+    def replay(self, tasks, snapshot_seq, paths, repair=True):
+        """Apply every record newer than the snapshot; return the last seq seen"""
+        last_seq = snapshot_seq
+        for path in paths:
+            for record in self.read_records(path, repair=repair and path == self.journal_file):
+                if record.get("seq", 0) <= snapshot_seq:
+                    continue
+                apply_journal_record(tasks, record)
+                if record.get("op") in LEGACY_JOURNAL_OPS:
+                    self.replayed_legacy = True
+                last_seq = max(last_seq, record["seq"])
+        return last_seq
+
+    def read_tasks(self):
+        """Snapshot plus journal as a task list, read without locking, repairing or rewriting any file"""
+        tasks, snapshot_seq, source = self.read_snapshot()
+        by_id = index_tasks(tasks)
+        self.replay(by_id, snapshot_seq, self.replay_paths(snapshot_seq, source) + [self.journal_file], repair=False)
+        return list(by_id.values())
+
+    def load(self):
+        """Load the snapshot and replay the journal; return an id -> task map"""
+        with self.lock:
+            if not any(os.path.exists(path) for path in [self.data_file] + self.backup_files()):
+                self.write_snapshot([], 0)
+            tasks, snapshot_seq, source = self.read_snapshot()
+            had_ids = all(task.get("id") for task in tasks)
+            by_id = index_tasks(tasks)
+            paths = self.replay_paths(snapshot_seq, source) + [self.journal_file]
+            self.seq = self.replay(by_id, snapshot_seq, paths)
+            self.pending = self.seq - snapshot_seq
+            if not had_ids or self.replayed_legacy:
+                # Freshly assigned IDs must be persisted before anything refers to them
+                self.write_snapshot(list(by_id.values()), self.seq)
+                snapshot_seq = self.seq
+                self.pending = 0
+            self.journal_key = file_key(self.journal_file)
+            self.journal_head = first_line(self.journal_file)
+            self.offset = self.journal_key[2] if self.journal_key else 0
+            self.snapshot_key = file_key(self.data_file)
+            self.last_snapshot_seq = snapshot_seq
+            # Without a later compaction, the last one's folded segments would
+            # stay forever; a backup standing in for the snapshot still needs them
+            if source == self.data_file:
+                self.remove_expired_segments()
+        return by_id
+
+    def set_aside(self):
+        """Rename the snapshot, backups and journal segments out of the way; return their new names"""
+        segments = [path for _, path in self.sealed_segments(folded=True)]
+        paths = [self.data_file] + self.backup_files() + [self.journal_file] + segments
+        return [set_aside(path) for path in paths if os.path.exists(path)]
+
+    def poll(self):
+        """Queue records other processes wrote; a few stat calls when nothing changed"""
+        if file_key(self.journal_file) == self.journal_key and file_key(self.data_file) == self.snapshot_key:
+            return False
+        with self.lock:
+            records = self.read_external()
+        with self._buffer_lock:
+            self.incoming.extend(records)
+        return bool(records)
+
+    def read_external(self):
+        """Records other processes added since we last looked; call holding the lock"""
+        seen = self.seq
+        records = []
+        # Inodes get reused, so the file we follow is recognized by its first record
+        head = first_line(self.journal_file)
+        rotated = self.journal_head is not None and head != self.journal_head
+        for last_seq, path in self.sealed_segments(folded=True):
+            # Segments are named after their last seq; older ones hold nothing new
+            if last_seq <= seen:
+                continue
+            resume = rotated and first_line(path) == self.journal_head
+            records += self.read_from(path, self.offset if resume else 0)[0]
+        if rotated:
+            self.offset = 0
+        current = file_key(self.journal_file)
+        if current is not None:
+            if current[2] < self.offset:
+                return self.reload_records()  # rewritten in place
+            tail, self.offset = self.read_from(self.journal_file, self.offset)
+            records += tail
+        self.journal_key = file_key(self.journal_file)
+        self.journal_head = (head or first_line(self.journal_file)) if self.offset else None
+        records = [r for r in records if r.get("seq", 0) > seen]
+        # Seqs are handed out one by one under the lock, so a gap means the
+        # records were folded into the snapshot and removed before we saw them
+        if any(r.get("seq") != seen + i for i, r in enumerate(records, 1)):
+            return self.reload_records()
+        snapshot_key = file_key(self.data_file)
+        if snapshot_key != self.snapshot_key:
+            # Compaction moves the snapshot forward, to no further than what
+            # the sealed segments held; anything else is a replaced file
+            snapshot_seq = self.snapshot_seq()
+            if not self.last_snapshot_seq <= snapshot_seq <= seen + len(records):
+                return self.reload_records()
+            self.snapshot_key = snapshot_key
+            self.last_snapshot_seq = snapshot_seq
+        if records:
+            self.seq = records[-1]["seq"]
+            self.pending += len(records)
+        return records
+
+    def reload_records(self):
+        """Full reload when the files changed in a way the tail cannot explain.
+
+        Returned as a clear followed by a put of every task, which the store
+        merges like any other records.
+        """
+        print(colored("Task files were replaced by another program; reloading", "yellow"))
+        by_id = self.load()
+        with self._buffer_lock:
+            # Whatever we wrote is either in the reloaded state or was overwritten
+            self._written = {}
+        # Newer than anything we wrote, older than anything not yet on disk
+        return [{"seq": math.inf, "op": "clear"}, {"seq": math.inf, "op": "put", "tasks": list(by_id.values())}]
+
+    def take_incoming(self):
+        """Hand over queued external records with our newer writes per task ID.
+
+        The second value maps task ID (None for a clear) to the seq of our
+        latest write, infinite for records not yet on disk; an external
+        record only wins for IDs where it is newer.
+        """
+        with self._buffer_lock:
+            records, self.incoming = self.incoming, []
+            if not records:
+                return [], {}
+            # Anything read from now on is newer than all we have written
+            shadowed, self._written = self._written, {}
+            for _, task_ids in self._buffer + self._in_flight:
+                for task_id in task_ids if task_ids is not None else (None,):
+                    shadowed[task_id] = math.inf
+        return records, shadowed
+
+    # ---- Writing ----
+
+    def append(self, op, **fields):
+        """Serialize one change record; it becomes durable on the next flush"""
+        record = {"op": op}
+        record.update(fields)
+        if op == "clear":
+            task_ids = None
+        else:
+            task_ids = fields.get("ids") or [task["id"] for task in fields.get("tasks", ())]
+        body = json.dumps(record, separators=(",", ":"))
+        with self._buffer_lock:
+            self._buffer.append((body, task_ids))
+
+    def has_unflushed(self):
+        return bool(self._buffer)
+
+    def flush(self):
+        """Write and fsync every buffered record in one go, numbered after other processes' records"""
+        if not self._buffer:
+            return
+        with self.lock:
+            external = self.read_external()
+            with self._buffer_lock:
+                entries, self._buffer = self._buffer, []
+                self._in_flight = entries
+                first = self.seq + 1
+                self.seq += len(entries)
+            lines = [f'{{"seq":{seq},{body[1:]}\n' for seq, (body, _) in enumerate(entries, first)]
+            try:
+                handle = self.journal_handle()
+                handle.write("".join(lines).encode("utf-8"))
+                handle.flush()
+                os.fsync(handle.fileno())
+            except Exception:
+                # Keep the records so the next flush retries them in order
+                with self._buffer_lock:
+                    self._buffer[:0] = entries
+                    self._in_flight = []
+                    self.incoming.extend(external)
+                    # Nobody else could write meanwhile, so the numbers are still free
+                    self.seq = first - 1
+                raise
+            self.offset = handle.tell()
+            self.journal_key = file_key(self.journal_file)
+            if self.journal_head is None:
+                self.journal_head = first_line(self.journal_file)
+            with self._buffer_lock:
+                for seq, (_, task_ids) in enumerate(entries, first):
+                    for task_id in task_ids if task_ids is not None else (None,):
+                        self._written[task_id] = seq
+                self._in_flight = []
+                self.incoming.extend(external)
+            self.pending += len(lines)
+            self.maybe_compact()
+
+    def journal_handle(self):
+        """The append handle, reopened if another process sealed the journal"""
+        if self._handle is not None:
+            st = os.fstat(self._handle.fileno())
+            if self.journal_key is None or (st.st_dev, st.st_ino) != self.journal_key[:2]:
+                self._handle.close()
+                self._handle = None
+        if self._handle is None:
+            self._handle = open(self.journal_file, "ab")
+        return self._handle
+
+    def maybe_compact(self):
+        """Start a background compaction once the journal is large enough"""
+        if self.pending >= self.compact_threshold:
+            self.compact()
+
+    def compact(self, wait=False):
+        """Seal the active journal and fold it into the snapshot"""
+        with self.lock:
+            self.flush()
+            if self._compactor is None or not self._compactor.is_alive():
+                self.seal()
+                if self.sealed_segments():
+                    self._compactor = threading.Thread(target=self._compact_sealed, daemon=True)
+                    self._compactor.start()
+        # The compactor needs the lock, so wait for it outside
+        if wait and self._compactor is not None:
+            self._compactor.join()
+
+    def seal(self):
+        """Rename the active journal to a segment named after its last seq; call holding the lock"""
+        # Catch up first so that name really is the last seq in the file
+        external = self.read_external()
+        with self._buffer_lock:
+            self.incoming.extend(external)
+        if not self.pending:
+            return
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self.journal_key is not None and self.journal_key[2] > 0:
+            os.replace(self.journal_file, f"{self.journal_file}.{self.seq}")
+        self.journal_key = None
+        self.journal_head = None
+        self.offset = 0
+        self.pending = 0
+
+    def _compact_sealed(self):
+        """Background worker: merge sealed segments into a fresh snapshot"""
+        with self._compact_lock, self.lock:
+            try:
+                segments = [path for _, path in self.sealed_segments()]
+                tasks, snapshot_seq, source = self.read_snapshot()
+                by_id = index_tasks(tasks)
+                seq = self.replay(by_id, snapshot_seq, self.replay_paths(snapshot_seq, source))
+                self.write_snapshot(list(by_id.values()), seq)
+                self.remove_expired_segments()
+                # Instances that have not caught up yet read these instead of reloading
+                for path in segments:
+                    os.replace(path, f"{path}.folded")
+            except Exception as e:
+                print(colored(f"Error compacting journal: {e}", "red"))
+
+    def write_snapshot(self, tasks, seq):
+        """Atomically replace the snapshot, keeping earlier ones as backups"""
+        tmp_file = f"{self.data_file}.tmp"
+        with open(tmp_file, "wb") as f:
+            self.serializer.write(f, tasks, seq)
+            f.flush()
+            os.fsync(f.fileno())
+        self.rotate_backups()
+        os.replace(tmp_file, self.data_file)
+
+    def rotate_backups(self):
+        """Shift each backup one place older and link the current snapshot in as the newest.
+
+        The snapshot itself is never renamed, so the data file exists at
+        every point of a rewrite; only the oldest backup drops off.
+        """
+        if not os.path.exists(self.data_file) or not self.backups:
+            return
+        generations = self.backup_files()
+        for i in range(len(generations) - 1, 0, -1):
+            if os.path.exists(generations[i - 1]):
+                os.replace(generations[i - 1], generations[i])
+        staged = f"{self.backup_file}.tmp"
+        if os.path.exists(staged):
+            os.remove(staged)
+        try:
+            os.link(self.data_file, staged)
+        except OSError:
+            # Filesystems without hard links get a copy
+            shutil.copyfile(self.data_file, staged)
+        os.replace(staged, self.backup_file)
+
+    def close(self, compact=True):
+        """Flush outstanding work before the application exits"""
+        if self._compactor is not None:
+            self._compactor.join()
+        if compact:
+            self.compact(wait=True)
+        else:
+            self.flush()
+            if self._compactor is not None:
+                self._compactor.join()
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self.lock.close()
+
+
+class TaskCounters:
+    """Incremental completed and overdue counters for the status bar.
+
+    Open tasks with a due date wait in a min-heap until their date passes;
+    ``advance`` moves them into the overdue set, so reading a count is O(1)
+    and each change costs O(log n). Stale heap entries are skipped lazily.
+    """
+
+    def __init__(self):
+        self.completed = set()
+        self.overdue = set()
+        self.open_due = {}
+        self.heap = []
+        self.today = ""
+
+    def rebuild(self, tasks, today):
+        self.completed = set()
+        self.overdue = set()
+        self.open_due = {}
+        self.today = today
+        for task in tasks:
+            if task.get("crossed", False):
+                self.completed.add(task["id"])
+            elif task.get("due"):
+                self.open_due[task["id"]] = task["due"]
+                if task["due"] < today:
+                    self.overdue.add(task["id"])
+        self.rebuild_heap()
+
+    def track(self, task):
+        """Account for an added or edited task"""
+        task_id = task["id"]
+        self.untrack(task_id)
+        if task.get("crossed", False):
+            self.completed.add(task_id)
+        elif task.get("due"):
+            due = task["due"]
+            self.open_due[task_id] = due
+            if due < self.today:
+                self.overdue.add(task_id)
+            else:
+                heapq.heappush(self.heap, (due, task_id))
+                if len(self.heap) > 2 * len(self.open_due) + 64:
+                    self.rebuild_heap()
+
+    def untrack(self, task_id):
+        self.completed.discard(task_id)
+        self.overdue.discard(task_id)
+        self.open_due.pop(task_id, None)
+
+    def rebuild_heap(self):
+        self.heap = [(due, task_id) for task_id, due in self.open_due.items() if task_id not in self.overdue]
+        heapq.heapify(self.heap)
+
+    def advance(self, today):
+        """Move tasks whose due date has passed into the overdue set"""
+        if today < self.today:
+            # Clock went backwards: re-derive everything from the open due dates
+            self.overdue.clear()
+            self.rebuild_heap()
+        self.today = today
+        heap = self.heap
+        while heap and heap[0][0] < today:
+            due, task_id = heapq.heappop(heap)
+            if self.open_due.get(task_id) == due:
+                self.overdue.add(task_id)
+
+    def count_overdue(self, today):
+        if today != self.today:
+            self.advance(today)
+        return len(self.overdue)
+
+
+class TaskStore(abc.ABC):
+    """Storage engine interface used by ModernTodoApp.
+
+    Tasks are plain dicts identified by their persistent ``id`` field, which
+    ``get``, ``update`` and ``delete`` use to locate the stored record.
+    ``version`` is bumped by every mutation so cached views know when to
+    recompute. Engines must implement the abstract methods; the rest have
+    defaults for stores without a journal or background work.
+    """
+
+    version = 0
+
+    @abc.abstractmethod
+    def load(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def all(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def count(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def count_completed(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def count_overdue(self, today):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def completed_tasks(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def contains_text(self, text):
+        """Whether a task with the same text (ignoring case and spacing) exists"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def similar_tasks(self, text, limit=3):
+        """Tasks whose text is close to, but not the same as, ``text``"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, task_id):
+        raise NotImplementedError
+
+    def get_many(self, task_ids):
+        """Map each ID to its stored task, or None if there is no such task"""
+        return {task_id: self.get(task_id) for task_id in task_ids}
+
+    @abc.abstractmethod
+    def query(self, filter_text="", show_completed=True, sort_by="date"):
+        """Tasks matching search text in TaskQuery syntax, in ``sort_by`` order"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def add(self, task):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def extend(self, tasks):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update(self, task):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update_many(self, tasks):
+        """Store several edited tasks as one change"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, tasks):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self):
+        raise NotImplementedError
+
+    def positions(self, task_ids):
+        """Map stored task IDs to their place in insertion order, for ``restore``"""
+        return {}
+
+    def restore(self, tasks, positions):
+        """Re-add deleted tasks at the places ``positions`` reported before the delete"""
+        self.extend(tasks)
+
+    def stage_changes(self):
+        """Serialize pending changes for ``flush``; call on the UI thread"""
+
+    def flush(self):
+        """Make staged changes durable; safe to call off the UI thread"""
+
+    def save(self):
+        """Stage and flush in one go, for single-threaded callers"""
+        self.stage_changes()
+        self.flush()
+
+    def is_dirty(self):
+        """Whether anything changed since the last flush"""
+        return False
+
+    def checkpoint(self):
+        """Fold pending changes into the main file (Ctrl+S)"""
+
+    def poll_external(self):
+        """Look for changes other processes made; safe to call off the UI thread"""
+
+    def merge_external(self):
+        """Apply changes other processes made; return whether any tasks changed"""
+        return False
+
+    def warm_up(self):
+        """Steps that build indexes ``load`` deferred; run one per idle slot"""
+        return iter(())
+
+    def export_rows(self):
+        """Tasks to export; iterated on the persistence thread"""
+        return self.all()
+
+    def set_aside(self):
+        """After a failed load, rename the store's files so a fresh store can start; return their new names"""
+        return []
+
+    def close(self, compact=True):
+        """Flush outstanding work; short-lived callers can skip compaction"""
+
+
+class JsonTaskStore(TaskStore):
+    """In-memory id -> task map persisted through a TaskJournal.
+
+    A SortIndex per sort mode is kept up to date on every change, so views
+    are produced by walking a ready index rather than sorting. Mutations only
+    mark task IDs dirty; ``stage_changes`` turns the dirty set into journal
+    records, so a task edited many times between saves is written once.
+    """
+
+    def __init__(self, data_file=DATA_FILE):
+        self.journal = TaskJournal(data_file)
+        self.by_id = {}
+        self.orders = {}
+        self.next_order = 0
+        self.sort_indexes = {}
+        self.search_index = None
+        self.search_backlog = []
+        self.duplicate_index = None
+        self.duplicate_backlog = []
+        self.text_index = None
+        self.text_backlog = []
+        self.counters = TaskCounters()
+        self.dirty_ids = set()
+        self.removed_ids = set()
+        self.restored_ids = set()
+        self.cleared = False
+
+    def load(self):
+        self.by_id = self.journal.load()
+        self.version += 1
+        # Validate and update task structure for backward compatibility
+        validate_task_structure(self.by_id.values())
+        self.orders = {task_id: i for i, task_id in enumerate(self.by_id)}
+        self.next_order = len(self.orders)
+        # Indexes are built on first use or by warm_up, after the first paint
+        self.sort_indexes = {}
+        self.search_index = None
+        self.search_backlog = []
+        self.duplicate_index = None
+        self.duplicate_backlog = []
+        self.text_index = None
+        self.text_backlog = []
+        self.counters.rebuild(self.by_id.values(), date.today().strftime("%Y-%m-%d"))
+
+    def index_tasks(self, tasks):
+        """Bring the sort indexes up to date for added or edited tasks"""
+        for task in tasks:
+            if task["id"] not in self.orders:
+                self.orders[task["id"]] = self.next_order
+                self.next_order += 1
+        for index in self.sort_indexes.values():
+            index.add_many(tasks, self.orders)
+        for task in tasks:
+            if self.search_index is not None:
+                self.search_index.add(task)
+            self.counters.track(task)
+            if self.duplicate_index is not None:
+                self.duplicate_index.add(task["id"], task["text"])
+            if self.text_index is not None:
+                self.text_index.add(task)
+
+    def sort_index(self, mode):
+        """The SortIndex for a sort mode, built on first use"""
+        index = self.sort_indexes.get(mode)
+        if index is None and mode in SORT_KEYS:
+            index = self.sort_indexes[mode] = SortIndex(SORT_KEYS[mode])
+            index.rebuild(self.by_id.values(), self.orders)
+        return index
+
+    def index_search_backlog(self, chunk=500):
+        """Add not-yet-indexed tasks to the trigram index, yielding after each chunk"""
+        if self.search_index is None:
+            self.search_index = TrigramIndex()
+            self.search_backlog = list(self.by_id)
+        while self.search_backlog:
+            batch = self.search_backlog[-chunk:]
+            del self.search_backlog[-chunk:]
+            for task_id in batch:
+                # Edits made meanwhile were indexed directly; deletions are skipped
+                task = self.by_id.get(task_id)
+                if task is not None:
+                    self.search_index.add(task)
+            yield
+
+    def searcher(self):
+        """The trigram index, finishing whatever warm_up has not built yet"""
+        for _ in self.index_search_backlog():
+            pass
+        return self.search_index
+
+    def index_text_backlog(self, chunk=500):
+        """Add not-yet-indexed tasks to the BM25 index, yielding after each chunk"""
+        if self.text_index is None:
+            self.text_index = FullTextIndex()
+            self.text_backlog = list(self.by_id)
+        while self.text_backlog:
+            batch = self.text_backlog[-chunk:]
+            del self.text_backlog[-chunk:]
+            for task_id in batch:
+                task = self.by_id.get(task_id)
+                if task is not None and task_id not in self.text_index.lengths:
+                    self.text_index.add(task)
+            yield
+
+    def index_duplicate_backlog(self, chunk=500):
+        """Add not-yet-indexed tasks to the duplicate index, yielding after each chunk"""
+        self.start_duplicate_index()
+        while self.duplicate_backlog:
+            batch = self.duplicate_backlog[-chunk:]
+            del self.duplicate_backlog[-chunk:]
+            for task_id in batch:
+                task = self.by_id.get(task_id)
+                if task is not None:
+                    self.duplicate_index.add(task_id, task["text"])
+            yield
+
+    def start_duplicate_index(self):
+        if self.duplicate_index is None:
+            self.duplicate_index = DuplicateIndex()
+            self.duplicate_backlog = list(self.by_id)
+
+    def warm_up(self):
+        # Started now rather than when the chain reaches it, so duplicate
+        # checks use the partial index instead of building it in one go
+        self.start_duplicate_index()
+        # Sort indexes stay on demand: one sorted() call each, too coarse for idle slots
+        return itertools.chain(self.index_search_backlog(), self.index_duplicate_backlog(),
+                               self.index_text_backlog())
+
+    def duplicates(self):
+        """The duplicate index, finishing whatever warm_up has not built yet"""
+        for _ in self.index_duplicate_backlog():
+            pass
+        return self.duplicate_index
+
+    def ranker(self):
+        """The BM25 full-text index, finishing whatever warm_up has not built yet"""
+        for _ in self.index_text_backlog():
+            pass
+        return self.text_index
+
+    def all(self):
+        return list(self.by_id.values())
+
+    def count(self):
+        return len(self.by_id)
+
+    def count_completed(self):
+        return len(self.counters.completed)
+
+    def count_overdue(self, today):
+        return self.counters.count_overdue(today)
+
+    def completed_tasks(self):
+        return [self.by_id[i] for i in sorted(self.counters.completed, key=self.orders.__getitem__)]
+
+    def contains_text(self, text):
+        if self.duplicate_backlog:
+            # Mid warm-up: the indexed part answers, the rest is compared directly
+            key = normalize_text(text)
+            return self.duplicate_index.has_exact(text) or any(
+                normalize_text(self.by_id[i]["text"]) == key for i in self.duplicate_backlog if i in self.by_id)
+        return self.duplicates().has_exact(text)
+
+    def similar_tasks(self, text, limit=3):
+        # Mid warm-up, near duplicates come from the tasks indexed so far
+        index = self.duplicate_index if self.duplicate_backlog else self.duplicates()
+        return [self.by_id[i] for i in index.similar(text, limit)]
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def plan_query(self, query):
+        """Candidate IDs from the most selective index, and what is left to check.
+
+        Each positive filter is sized with two bisects on its SortIndex (the
+        completed state with the counters' set) and each text term by its
+        rarest trigram; only the smallest is fetched. Text terms are then
+        applied to that set through the trigram index, rarest first, and
+        negated ones are subtracted last, so only filters remain to be
+        checked task by task.
+        Returns (IDs or None for every task, remaining TaskQuery).
+        """
+        best = None
+        for term in query.filters:
+            if term.negated:
+                continue
+            if term.mode == "crossed" and term.low == term.high:
+                # The counters already keep the completed set
+                done = self.counters.completed
+                size = len(done) if term.low else len(self.by_id) - len(done)
+                fetch = (lambda: set(done)) if term.low else (lambda: self.by_id.keys() - done)
+                if best is None or size < best[0]:
+                    best = (size, term, fetch)
+            else:
+                index = self.sort_index(term.mode)
+                start, end = index.span(term.low, term.high)
+                if best is None or end - start < best[0]:
+                    best = (end - start, term, lambda index=index, start=start, end=end: index.ids_between(start, end))
+        searcher = self.searcher() if query.terms else None
+        sizes = {term: searcher.estimate(term[0]) for term in query.terms if not term[1]}
+        for term, size in sizes.items():
+            if best is None or size < best[0]:
+                best = (size, term, lambda text=term[0]: searcher.search(text))
+        # Walking everything beats building a set of most of it
+        if best is None or isinstance(best[1], QueryFilter) and best[0] * 2 > len(self.by_id):
+            if not query.terms:
+                return None, query
+            best = None
+        positive = sorted(sizes, key=sizes.get)
+        if best is not None and isinstance(best[1], QueryFilter):
+            ids = best[2]()
+            rest = TaskQuery([f for f in query.filters if f is not best[1]])
+        else:
+            ids = searcher.search(positive.pop(0)[0]) if positive else None
+            rest = TaskQuery(query.filters)
+        for text, _ in positive:
+            ids = searcher.narrow(ids, text)
+        for text, negated in query.terms:
+            if negated:
+                # With no positive term, the first negation is taken from every task
+                ids = self.by_id.keys() - searcher.search(text) if ids is None else ids - searcher.narrow(ids, text)
+        for term in [f for f in rest.filters if f.mode == "crossed" and f.low == f.high]:
+            if ids is not None:
+                # The counters' completed set answers done/open without looking at tasks
+                ids = ids & self.counters.completed if term.low != term.negated else ids - self.counters.completed
+                rest.filters.remove(term)
+        return ids, rest
+
+    def query(self, filter_text="", show_completed=True, sort_by="date"):
+        query = parse_query(filter_text)
+        ranked_text = query.ranked_text() if sort_by == RELEVANCE_SORT else ""
+        if sort_by == RELEVANCE_SORT and not ranked_text:
+            sort_by = "date"
+        matches, rest = self.plan_query(query)
+        # Relevance has no SortIndex: hits come in insertion order, then get ranked
+        index = self.sort_index(sort_by)
+        by_id = self.by_id
+        hidden = self.counters.completed if not show_completed else ()
+        # plan_query applied every text term, so only field filters are left
+        checked = not rest.filters
+        if matches is not None:
+            # Narrow the candidates before ordering them
+            if hidden:
+                matches = matches - hidden
+            if not checked:
+                matches = {i for i in matches if rest.matches(by_id[i])}
+            hidden, checked = (), True
+        walk = index if index is not None else by_id
+        if matches is None:
+            ids = walk
+        elif len(matches) * 8 < len(by_id):
+            # A handful of hits is cheaper to sort than walking the whole index
+            ids = sorted(matches, key=(index.entry_of if index is not None else self.orders).__getitem__)
+        else:
+            # filter() with a bound __contains__ keeps the walk out of the interpreter loop
+            ids = list(filter(matches.__contains__, walk))
+        if hidden:
+            ids = list(itertools.filterfalse(hidden.__contains__, ids))
+        if ranked_text:
+            scores = self.ranker().scores(ranked_text, ids)
+            # Reversed sorts stay stable, so equally relevant tasks keep insertion order
+            ids = sorted(scores, key=scores.__getitem__, reverse=True)
+        if checked:
+            return list(map(by_id.__getitem__, ids))
+        return [t for t in map(by_id.__getitem__, ids) if rest.matches(t)]
+
+    def add(self, task):
+        self.extend([task])
+
+    def extend(self, tasks):
+        for task in tasks:
+            # Imported copies of existing tasks get IDs of their own
+            if not task.get("id") or task["id"] in self.by_id:
+                task["id"] = new_task_id()
+            self.by_id[task["id"]] = task
+        self.index_tasks(tasks)
+        self.mark_dirty(tasks)
+
+    def update(self, task):
+        self.update_many([task])
+
+    def update_many(self, tasks):
+        for task in tasks:
+            self.by_id[task["id"]] = task
+        self.index_tasks(tasks)
+        self.mark_dirty(tasks)
+
+    def mark_dirty(self, tasks):
+        for task in tasks:
+            self.dirty_ids.add(task["id"])
+            self.removed_ids.discard(task["id"])
+        self.version += 1
+
+    def delete(self, tasks):
+        task_ids = [t["id"] for t in tasks]
+        self.unindex_tasks(task_ids)
+        for task_id in task_ids:
+            self.dirty_ids.discard(task_id)
+            self.restored_ids.discard(task_id)
+            self.removed_ids.add(task_id)
+        self.version += 1
+
+    def positions(self, task_ids):
+        return {task_id: self.orders[task_id] for task_id in task_ids if task_id in self.orders}
+
+    def restore(self, tasks, positions):
+        restored = set()
+        for task in tasks:
+            if task.get("id") in positions and task["id"] not in self.by_id:
+                # index_tasks keeps an order that is already set
+                self.orders[task["id"]] = positions[task["id"]]
+                restored.add(task["id"])
+        anchors = self.anchors(restored)
+        # Tasks that end up with no anchor are appended, so add them in their old order
+        self.extend(sorted(tasks, key=lambda task: positions.get(task.get("id"), math.inf)))
+        if anchors:
+            # Keep the map in insertion order, as a reload would rebuild it
+            move_tasks_before(self.by_id, anchors)
+        self.restored_ids |= restored
+
+    def anchors(self, task_ids):
+        """Map each restored task to the task after it in insertion order, for journal replay.
+
+        The map is kept in insertion order, so that task is found by bisecting.
+        """
+        if not task_ids:
+            return {}
+        ids = [task_id for task_id in self.by_id if task_id not in task_ids]
+        orders = list(map(self.orders.__getitem__, ids))
+        anchors = {}
+        for order, task_id in sorted((self.orders[task_id], task_id) for task_id in task_ids):
+            i = bisect.bisect_right(orders, order)
+            if i < len(ids):
+                anchors[task_id] = ids[i]
+        return anchors
+
+    def unindex_tasks(self, task_ids):
+        """Drop tasks from the map and every index"""
+        for task_id in task_ids:
+            self.by_id.pop(task_id, None)
+            self.orders.pop(task_id, None)
+            if self.search_index is not None:
+                self.search_index.discard(task_id)
+            if self.duplicate_index is not None:
+                self.duplicate_index.discard(task_id)
+            if self.text_index is not None:
+                self.text_index.discard(task_id)
+            self.counters.untrack(task_id)
+        for index in self.sort_indexes.values():
+            index.discard_many(task_ids)
+
+    def clear(self):
+        self.by_id.clear()
+        self.orders.clear()
+        for index in self.sort_indexes.values():
+            index.clear()
+        self.search_index = None
+        self.search_backlog = []
+        self.duplicate_index = None
+        self.duplicate_backlog = []
+        self.text_index = None
+        self.text_backlog = []
+        self.counters.rebuild([], self.counters.today)
+        self.dirty_ids.clear()
+        self.removed_ids.clear()
+        self.restored_ids.clear()
+        self.cleared = True
+        self.version += 1
+
+    def is_dirty(self):
+        return bool(self.dirty_ids or self.removed_ids or self.cleared or self.journal.has_unflushed())
+
+    def stage_changes(self):
+        if self.cleared:
+            self.journal.append("clear")
+            self.cleared = False
+        if self.dirty_ids:
+            # Insertion order, so replay rebuilds the same task order
+            dirty = sorted((i for i in self.dirty_ids if i in self.by_id), key=self.orders.__getitem__)
+            restored = self.restored_ids.intersection(dirty)
+            if restored:
+                # Undone deletions go back to their old place on replay too
+                self.journal.append("put", tasks=[self.by_id[i] for i in dirty], before=self.anchors(restored))
+            else:
+                self.journal.append("put", tasks=[self.by_id[i] for i in dirty])
+            self.dirty_ids = set()
+            self.restored_ids = set()
+        if self.removed_ids:
+            self.journal.append("remove", ids=list(self.removed_ids))
+            self.removed_ids = set()
+
+    def flush(self):
+        self.journal.flush()
+
+    def checkpoint(self):
+        self.journal.compact()
+
+    def poll_external(self):
+        self.journal.poll()
+
+    def merge_external(self):
+        records, shadowed = self.journal.take_incoming()
+        if not records:
+            return False
+        # Local changes not yet journaled will be written after these records
+        for task_id in self.dirty_ids | self.removed_ids:
+            shadowed[task_id] = math.inf
+        if self.cleared:
+            shadowed[None] = math.inf
+        changed, removed = {}, set()
+        for record in records:
+            seq = record.get("seq", 0)
+            if seq <= shadowed.get(None, 0):
+                continue
+            op = record.get("op")
+            if op == "put":
+                for task in record["tasks"]:
+                    if seq > shadowed.get(task["id"], 0):
+                        changed[task["id"]] = task
+                        removed.discard(task["id"])
+            elif op in ("remove", "clear"):
+                task_ids = record["ids"] if op == "remove" else list(self.by_id) + list(changed)
+                for task_id in task_ids:
+                    if seq > shadowed.get(task_id, 0):
+                        changed.pop(task_id, None)
+                        removed.add(task_id)
+        removed = [i for i in removed if i in self.by_id]
+        # A reload re-puts every task, most of them unchanged
+        changed = [t for i, t in changed.items() if self.by_id.get(i) != t]
+        if removed:
+            self.unindex_tasks(removed)
+        if changed:
+            validate_task_structure(changed)
+            for task in changed:
+                self.by_id[task["id"]] = task
+            self.index_tasks(changed)
+        if not removed and not changed:
+            return False
+        self.version += 1
+        return True
+
+    def set_aside(self):
+        return self.journal.set_aside()
+
+    def close(self, compact=True):
+        self.stage_changes()
+        self.journal.close(compact)
+
+
+class SqliteTaskStore(TaskStore):
+    """SQLite storage engine with indexes on due, priority, category and crossed.
+
+    Each row keeps the full task as JSON next to the indexed columns, so
+    filters, sort modes and counters run as indexed queries instead of
+    Python scans. Queries select only row IDs, which the column indexes
+    cover; decoded tasks are cached by row and dropped when they change
+    here or another connection commits. An existing ``todo.json`` is
+    migrated on first open.
+    """
+
+    SORT_COLUMNS = {
+        "date": "due_key",
+        "priority": "priority_rank",
+        "category": "category",
+        "created": "created",
+        "crossed": "crossed",
+    }
+
+    def __init__(self, db_file=DB_FILE, legacy_file=DATA_FILE):
+        self.db_file = db_file
+        self.legacy_file = legacy_file
+        self.conn = None
+        self.duplicate_index = None
+        self.duplicate_backlog = None
+        self.text_index = None
+        self.data_version = None
+        self.task_cache = {}
+        self.task_rows = {}
+
+    def load(self):
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                uid TEXT,
+                data TEXT NOT NULL,
+                text_lc TEXT NOT NULL,
+                search TEXT NOT NULL,
+                crossed INTEGER NOT NULL,
+                priority_rank INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                due TEXT NOT NULL,
+                due_key TEXT NOT NULL,
+                created TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks(due_key);
+            CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority_rank);
+            CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
+            CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created);
+            CREATE INDEX IF NOT EXISTS idx_tasks_crossed ON tasks(crossed, due);
+            CREATE INDEX IF NOT EXISTS idx_tasks_text ON tasks(text_lc);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self.add_task_ids()
+        self.refresh_search_column()
+        self.refresh_text_column()
+        self.migrate_json()
+        self.data_version = self.scalar("PRAGMA data_version")
+        self.version += 1
+
+    def refresh_search_column(self):
+        """Rebuild the search column for databases created before notes were searchable"""
+        if self.conn.execute("SELECT value FROM meta WHERE key = 'search_fields'").fetchone():
+            return
+        with self.conn:
+            rows = self.conn.execute("SELECT id, data FROM tasks").fetchall()
+            self.conn.executemany("UPDATE tasks SET search = ? WHERE id = ?",
+                                  [(search_document(json.loads(data)), rowid) for rowid, data in rows])
+            self.conn.execute("INSERT INTO meta VALUES ('search_fields', 'text,notes,category,priority')")
+
+    def refresh_text_column(self):
+        """Switch text_lc from lower() to normalize_text for older databases"""
+        if self.conn.execute("SELECT value FROM meta WHERE key = 'text_key'").fetchone():
+            return
+        with self.conn:
+            rows = self.conn.execute("SELECT id, data FROM tasks").fetchall()
+            self.conn.executemany("UPDATE tasks SET text_lc = ? WHERE id = ?",
+                                  [(normalize_text(json.loads(data)["text"]), rowid) for rowid, data in rows])
+            self.conn.execute("INSERT INTO meta VALUES ('text_key', 'casefold')")
+
+    def add_task_ids(self):
+        """Give databases created before task IDs a uid column and backfill it"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")]
+        with self.conn:
+            if "uid" not in columns:
+                self.conn.execute("ALTER TABLE tasks ADD COLUMN uid TEXT")
+            rows = self.conn.execute("SELECT id, data FROM tasks WHERE uid IS NULL").fetchall()
+            for rowid, data in rows:
+                task = json.loads(data)
+                if not task.get("id"):
+                    task["id"] = new_task_id()
+                self.conn.execute("UPDATE tasks SET uid = ?, data = ? WHERE id = ?",
+                                  (task["id"], json.dumps(task), rowid))
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_uid ON tasks(uid)")
+
+    def migrate_json(self):
+        """Import an existing JSON snapshot + journal the first time we open"""
+        done = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated'").fetchone()
+        if done or not os.path.exists(self.legacy_file):
+            return
+        # Read-only: the JSON files stay exactly as they were, should the user go back
+        tasks = TaskJournal(self.legacy_file).read_tasks()
+        validate_task_structure(tasks)
+        with self.conn:
+            self.insert_rows(tasks)
+            self.conn.execute("INSERT INTO meta VALUES ('migrated', ?)", (self.legacy_file,))
+        print(colored(f"Migrated {len(tasks)} tasks from {self.legacy_file}", "green"))
+
+    def row_values(self, task):
+        record = task_record(task)
+        priority = record.get("priority", "Medium")
+        category = record.get("category", "Other")
+        due = record.get("due", "")
+        return (record["id"],
+                json.dumps(record),
+                normalize_text(record["text"]),
+                search_document(record),
+                1 if record.get("crossed", False) else 0,
+                PRIORITY_RANK.get(priority, 1),
+                category,
+                due,
+                due or NO_DUE_KEY,
+                record.get("created", ""))
+
+    def insert_rows(self, tasks, rowids=None):
+        existing = self.get_many([task["id"] for task in tasks if task.get("id")])
+        seen = set()
+        for task in tasks:
+            # Imported copies of existing tasks get IDs of their own
+            if not task.get("id") or existing.get(task["id"]) is not None or task["id"] in seen:
+                task["id"] = new_task_id()
+            seen.add(task["id"])
+        if not rowids:
+            self.conn.executemany(
+                "INSERT INTO tasks (uid, data, text_lc, search, crossed, priority_rank, category, due, due_key, "
+                "created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [self.row_values(task) for task in tasks])
+            return
+        wanted = list(rowids.values())
+        taken = set()
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            taken.update(rowid for (rowid,) in self.conn.execute(
+                f"SELECT id FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+        # A NULL row ID is assigned as usual, after the current last row
+        self.conn.executemany(
+            "INSERT INTO tasks (id, uid, data, text_lc, search, crossed, priority_rank, category, due, due_key, "
+            "created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(None if rowids.get(task["id"]) in taken else rowids.get(task["id"]),) + self.row_values(task)
+             for task in tasks])
+
+    def fetch(self, sql, params=()):
+        """Run a query selecting row ids and return its tasks, decoding only uncached rows"""
+        rowids = [rowid for (rowid,) in self.conn.execute(sql, params)]
+        cache = self.task_cache
+        missing = [rowid for rowid in rowids if rowid not in cache]
+        if len(missing) > 5000:
+            # A cold cache is filled in one scan rather than thousands of IN lookups
+            self.cache_rows("SELECT id, uid, data FROM tasks")
+        else:
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                self.cache_rows(f"SELECT id, uid, data FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+        return [cache[rowid] for rowid in rowids]
+
+    def cache_rows(self, sql, params=()):
+        for rowid, uid, data in self.conn.execute(sql, params):
+            if rowid not in self.task_cache:
+                self.task_cache[rowid] = json.loads(data)
+                self.task_rows[uid] = rowid
+
+    def forget(self, tasks):
+        for task in tasks:
+            rowid = self.task_rows.pop(task.get("id"), None)
+            self.task_cache.pop(rowid, None)
+
+    def drop_cache(self):
+        self.task_cache = {}
+        self.task_rows = {}
+
+    def scalar(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def get(self, task_id):
+        return self.get_many([task_id])[task_id]
+
+    def get_many(self, task_ids):
+        found = dict.fromkeys(task_ids)
+        missing = [task_id for task_id in found if task_id not in self.task_rows]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            self.cache_rows(f"SELECT id, uid, data FROM tasks WHERE uid IN ({', '.join('?' * len(chunk))})", chunk)
+        for task_id in found:
+            rowid = self.task_rows.get(task_id)
+            found[task_id] = None if rowid is None else self.task_cache[rowid]
+        return found
+
+    def all(self):
+        return self.fetch("SELECT id FROM tasks ORDER BY id")
+
+    def count(self):
+        return self.scalar("SELECT COUNT(*) FROM tasks")
+
+    def count_completed(self):
+        return self.scalar("SELECT COUNT(*) FROM tasks WHERE crossed = 1")
+
+    def count_overdue(self, today):
+        return self.scalar("SELECT COUNT(*) FROM tasks WHERE crossed = 0 AND due != '' AND due < ?", (today,))
+
+    def completed_tasks(self):
+        return self.fetch("SELECT id FROM tasks WHERE crossed = 1 ORDER BY id")
+
+    def contains_text(self, text):
+        return self.conn.execute("SELECT 1 FROM tasks WHERE text_lc = ? LIMIT 1",
+                                 (normalize_text(text),)).fetchone() is not None
+
+    def index_duplicate_backlog(self, chunk=500):
+        """Add not-yet-indexed rows to the near-duplicate index, yielding after each chunk"""
+        self.start_duplicate_index()
+        while self.duplicate_backlog is not None:
+            # Keyset pages, so rows written between steps are picked up too
+            rows = self.conn.execute("SELECT id, uid, text_lc FROM tasks WHERE id > ? ORDER BY id LIMIT ?",
+                                     (self.duplicate_backlog, chunk)).fetchall()
+            for _, uid, text in rows:
+                self.duplicate_index.add(uid, text)
+            self.duplicate_backlog = rows[-1][0] if len(rows) == chunk else None
+            yield
+
+    def start_duplicate_index(self):
+        if self.duplicate_index is None:
+            self.duplicate_index = DuplicateIndex()
+            self.duplicate_backlog = 0  # highest row id indexed so far; None once complete
+
+    def warm_up(self):
+        self.start_duplicate_index()
+        return self.index_duplicate_backlog()
+
+    def duplicates(self):
+        """In-memory near-duplicate index, finishing whatever warm_up has not built yet"""
+        for _ in self.index_duplicate_backlog():
+            pass
+        return self.duplicate_index
+
+    def ranker(self):
+        """In-memory BM25 full-text index, built on the first relevance sort"""
+        if self.text_index is None:
+            self.text_index = FullTextIndex()
+            for (data,) in self.conn.execute("SELECT data FROM tasks"):
+                self.text_index.add(json.loads(data))
+        return self.text_index
+
+    def similar_tasks(self, text, limit=3):
+        # Mid warm-up, near duplicates come from the rows indexed so far
+        index = self.duplicate_index if self.duplicate_backlog is not None else self.duplicates()
+        return [self.get(task_id) for task_id in index.similar(text, limit)]
+
+    def query(self, filter_text="", show_completed=True, sort_by="date"):
+        query = parse_query(filter_text)
+        ranked_text = query.ranked_text() if sort_by == RELEVANCE_SORT else ""
+        if sort_by == RELEVANCE_SORT and not ranked_text:
+            sort_by = "date"
+        if not show_completed:
+            query.require("crossed", False, False)
+        where, params = [], []
+        # Filters become range conditions on indexed columns; SQLite's planner
+        # (with the statistics PRAGMA optimize gathers) picks the most selective
+        for term in query.filters:
+            column = self.SORT_COLUMNS[term.mode]
+            if term.low is not None and term.low == term.high:
+                clause, values = f"{column} = ?", [term.low]
+            else:
+                bounds = [(f"{column} >= ?", term.low), (f"{column} <= ?", term.high)]
+                clause = " AND ".join(c for c, v in bounds if v is not None) or "1"
+                values = [v for _, v in bounds if v is not None]
+            where.append(f"NOT ({clause})" if term.negated else clause)
+            params.extend(values)
+        for text, negated in query.terms:
+            where.append("instr(search, ?) = 0" if negated else "instr(search, ?) > 0")
+            params.append(text)
+        sql = "SELECT id FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {self.SORT_COLUMNS.get(sort_by, 'id')}, id"
+        tasks = self.fetch(sql, params)
+        if ranked_text:
+            scores = self.ranker().scores(ranked_text, [t["id"] for t in tasks])
+            tasks.sort(key=lambda t: scores[t["id"]], reverse=True)
+        return tasks
+
+    def add(self, task):
+        self.extend([task])
+
+    def extend(self, tasks):
+        self.restore(tasks, {})
+
+    def positions(self, task_ids):
+        task_ids = list(task_ids)
+        positions = {}
+        for start in range(0, len(task_ids), 500):
+            chunk = task_ids[start:start + 500]
+            positions.update(self.conn.execute(
+                f"SELECT uid, id FROM tasks WHERE uid IN ({', '.join('?' * len(chunk))})", chunk))
+        return positions
+
+    def restore(self, tasks, positions):
+        # Rows are listed in row ID order, so the old row ID is the old place
+        with self.conn:
+            self.insert_rows(tasks, positions)
+        self.version += 1
+        self.forget(tasks)
+        self.reindex_tasks(tasks)
+
+    def reindex_tasks(self, tasks):
+        """Bring the in-memory text indexes up to date for added or edited tasks"""
+        if self.duplicate_index is not None:
+            for task in tasks:
+                self.duplicate_index.add(task["id"], task["text"])
+        if self.text_index is not None:
+            for task in tasks:
+                self.text_index.add(task)
+
+    def update(self, task):
+        self.update_many([task])
+
+    def update_many(self, tasks):
+        self.version += 1
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE tasks SET uid = ?, data = ?, text_lc = ?, search = ?, crossed = ?, priority_rank = ?, "
+                "category = ?, due = ?, due_key = ?, created = ? WHERE uid = ?",
+                [self.row_values(task) + (task["id"],) for task in tasks])
+        self.forget(tasks)
+        self.reindex_tasks(tasks)
+
+    def delete(self, tasks):
+        self.version += 1
+        with self.conn:
+            self.conn.executemany("DELETE FROM tasks WHERE uid = ?", [(t["id"],) for t in tasks])
+        self.forget(tasks)
+        for index in (self.duplicate_index, self.text_index):
+            if index is not None:
+                for task in tasks:
+                    index.discard(task["id"])
+
+    def clear(self):
+        self.version += 1
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+        self.drop_cache()
+        self.duplicate_index = None
+        self.duplicate_backlog = None
+        self.text_index = None
+
+    def merge_external(self):
+        # SQLite does the locking; data_version moves when another connection commits
+        data_version = self.scalar("PRAGMA data_version")
+        if data_version == self.data_version:
+            return False
+        self.data_version = data_version
+        self.drop_cache()
+        self.duplicate_index = None
+        self.duplicate_backlog = None
+        self.text_index = None
+        self.version += 1
+        return True
+
+    def checkpoint(self):
+        # Runs on the persistence thread, which cannot share the UI connection
+        conn = sqlite3.connect(self.db_file)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        finally:
+            conn.close()
+
+    def export_rows(self):
+        # Stream rows through a connection of the persistence thread's own
+        conn = sqlite3.connect(self.db_file)
+        try:
+            cursor = conn.execute("SELECT data FROM tasks ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                for (data,) in rows:
+                    yield json.loads(data)
+        finally:
+            conn.close()
+
+    def set_aside(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if not os.path.exists(self.db_file):
+            return []
+        target = set_aside(self.db_file)
+        # SQLite looks for the WAL next to the database under its new name
+        return [target] + [set_aside(self.db_file + suffix, target + suffix)
+                           for suffix in ("-wal", "-shm") if os.path.exists(self.db_file + suffix)]
+
+    def close(self, compact=True):
+        if self.conn is not None:
+            # Refresh the index statistics the query planner uses
+            self.conn.execute("PRAGMA optimize")
+            self.conn.close()
+            self.conn = None
+
+
+class UndoEntry:
+    """One undoable change: the task states on the side not in the store.
+
+    ``states`` maps task ID to a task dict, or None where the task does not
+    exist on that side. Applying an entry swaps those states with the
+    store's current ones, so the same entry serves undo and redo and never
+    holds both versions of a task. ``positions`` holds where removed tasks
+    stood, so adding them back puts them in the same place.
+    """
+
+    def __init__(self, label, states, positions=None):
+        self.label = label
+        self.states = states
+        self.positions = positions or {}
+        self.created = time.monotonic()
+        self.size = self.estimate_size()
+
+    def estimate_size(self):
+        size = 0
+        for state in self.states.values():
+            size += 64
+            if state is not None:
+                size += 200 + len(state.get("text", "")) + len(state.get("notes", ""))
+        return size
+
+    def apply(self, store):
+        """Put ``states`` into the store and keep what they replaced"""
+        current = store.get_many(self.states)
+        removals, updates, additions = [], [], []
+        for task_id, state in self.states.items():
+            live = current[task_id]
+            if state is None:
+                if live is not None:
+                    removals.append(live)
+            elif live is None:
+                additions.append(state)
+            else:
+                updates.append(state)
+        positions = store.positions([task["id"] for task in removals]) if removals else {}
+        if removals:
+            store.delete(removals)
+        if updates:
+            store.update_many(updates)
+        if additions:
+            store.restore(additions, self.positions)
+        self.states = current
+        self.positions = positions
+        self.size = self.estimate_size()
+
+
+class UndoLog:
+    """Bounded undo/redo history of task deltas.
+
+    Each entry holds only the tasks a change touched: copies of edited
+    tasks as they were, the removed tasks themselves for deletions and
+    bare IDs for additions, never a copy of the whole list. The oldest
+    entries are dropped once the estimated size passes the memory budget,
+    and repeated edits of the same tasks in quick succession are folded
+    into one entry.
+    """
+
+    def __init__(self, budget=UNDO_MEMORY_BUDGET, max_entries=UNDO_MAX_ENTRIES):
+        self.budget = budget
+        self.max_entries = max_entries
+        self.undo_stack = []
+        self.redo_stack = []
+        self.size = 0
+
+    def record(self, label, states, positions=None):
+        """Remember how to revert a change that was just applied to the store.
+
+        For deletions, ``positions`` is what ``store.positions`` reported
+        just before the tasks were removed.
+        """
+        if not states:
+            return
+        self.size -= sum(entry.size for entry in self.redo_stack)
+        self.redo_stack = []
+        last = self.undo_stack[-1] if self.undo_stack else None
+        if (last is not None and last.states.keys() == states.keys()
+                and None not in last.states.values() and None not in states.values()
+                and time.monotonic() - last.created < UNDO_COALESCE_SECONDS):
+            # Same tasks edited again: undoing should go back past both edits
+            last.label = label
+            last.created = time.monotonic()
+            return
+        entry = UndoEntry(label, states, positions)
+        self.undo_stack.append(entry)
+        self.size += entry.size
+        self.compact()
+
+    def compact(self):
+        """Drop the oldest entries until the history fits its budget"""
+        while len(self.undo_stack) > 1 and (len(self.undo_stack) > self.max_entries or self.size > self.budget):
+            self.size -= self.undo_stack.pop(0).size
+        while self.redo_stack and self.size > self.budget:
+            self.size -= self.redo_stack.pop(0).size
+
+    def undo(self, store):
+        """Revert the newest change; return its entry, or None if there is none"""
+        return self.step(store, self.undo_stack, self.redo_stack)
+
+    def redo(self, store):
+        return self.step(store, self.redo_stack, self.undo_stack)
+
+    def step(self, store, source, target):
+        if not source:
+            return None
+        entry = source.pop()
+        self.size -= entry.size
+        entry.apply(store)
+        target.append(entry)
+        self.size += entry.size
+        return entry
+
+    def clear(self):
+        self.undo_stack = []
+        self.redo_stack = []
+        self.size = 0
+
+
+class TaskViewModel:
+    """Memoized filtered and sorted view of a TaskStore.
+
+    The result is keyed on (search text, sort mode, show completed, store
+    version), so repeated refreshes with nothing changed reuse the list on
+    screen and selection handlers resolve rows without recomputing it.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.key = None
+        self.tasks = []
+        self.row_ids = []
+
+    def rows(self, filter_text, show_completed, sort_by):
+        """Return the visible tasks, recomputing only when the key changes"""
+        key = (filter_text, sort_by, show_completed, self.store.version)
+        if key != self.key:
+            self.tasks = self.store.query(filter_text, show_completed, sort_by)
+            self.row_ids = [task["id"] for task in self.tasks]
+            self.key = key
+        return self.tasks
+
+    def task_at(self, row):
+        """The stored task behind a rendered row"""
+        return self.store.get(self.row_ids[row])
+
+
+def open_task_store(backend=STORAGE_BACKEND):
+    """Create the configured storage engine"""
+    if backend == "sqlite":
+        return SqliteTaskStore(DB_FILE, DATA_FILE)
+    return JsonTaskStore(DATA_FILE)